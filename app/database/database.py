@@ -14,8 +14,17 @@ logger = logging.getLogger(__name__)
 DATA_DIRECTORY = os.environ.get("DATA_DIRECTORY", "./data")
 DATABASE_URL = f"sqlite:///{DATA_DIRECTORY}/todoist.db"
 
+def ensure_data_directory(path: str) -> None:
+    """
+    Create the data directory if it doesn't exist.
+    
+    Args:
+        path: Directory where the database file is stored
+    """
+    os.makedirs(path, exist_ok=True)
+
 # Ensure data directory exists
-os.makedirs(DATA_DIRECTORY, exist_ok=True)
+ensure_data_directory(DATA_DIRECTORY)
 
 # Create engine with retry mechanism
 def create_db_engine(max_retries=3, retry_delay=2):
@@ -8,6 +8,21 @@ from pydantic import BaseModel, EmailStr, Field, validator
 import re
 
 
+def _check_password_strength(password: str) -> str:
+    """
+    Require at least one digit, one uppercase and one lowercase letter.
+    
+    The str methods are Unicode-aware, so non-ASCII letters count too.
+    """
+    if not any(char.isdigit() for char in password):
+        raise ValueError('Password must contain at least one digit')
+    if not any(char.isupper() for char in password):
+        raise ValueError('Password must contain at least one uppercase letter')
+    if not any(char.islower() for char in password):
+        raise ValueError('Password must contain at least one lowercase letter')
+    return password
+
+
 class UserBase(BaseModel):
     """Base user schema with common attributes."""
     username: str = Field(..., min_length=3, max_length=50, example="johndoe")
@@ -21,13 +36,7 @@ class UserCreate(UserBase):
     @validator('password')
     def password_strength(cls, v):
         """Validate password strength."""
-        if not any(char.isdigit() for char in v):
-            raise ValueError('Password must contain at least one digit')
-        if not any(char.isupper() for char in v):
-            raise ValueError('Password must contain at least one uppercase letter')
-        if not any(char.islower() for char in v):
-            raise ValueError('Password must contain at least one lowercase letter')
-        return v
+        return _check_password_strength(v)
 
 
 class UserLogin(BaseModel):
@@ -57,14 +66,7 @@ class UserUpdate(BaseModel):
         """Validate password strength if provided."""
         if v is None:
             return v
-            
-        if not any(char.isdigit() for char in v):
-            raise ValueError('Password must contain at least one digit')
-        if not any(char.isupper() for char in v):
-            raise ValueError('Password must contain at least one uppercase letter')
-        if not any(char.islower() for char in v):
-            raise ValueError('Password must contain at least one lowercase letter')
-        return v
+        return _check_password_strength(v)
 
     class Config:
         """Pydantic configuration."""
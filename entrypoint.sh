@@ -28,10 +28,11 @@ case "$1" in
     ;;
   e2e-test|e2e-tests)
     echo "🧪 Running E2E tests..."
+    # Tests are spread over xdist workers; each xdist_group stays on one worker
     if [ -n "$2" ]; then
-        python -m pytest -xvs "$2"
+        python -m pytest -xvs -n auto --dist=loadgroup "$2"
     else
-        python -m pytest -xvs tests/e2e
+        python -m pytest -xvs -n auto --dist=loadgroup tests/e2e
     fi
     ;;
   unit-test|unit-tests)
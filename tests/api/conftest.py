@@ -0,0 +1,7 @@
+"""
+Shared configuration for the API tests.
+"""
+
+from tests.helpers import use_fast_password_hashing
+
+use_fast_password_hashing()
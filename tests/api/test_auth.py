@@ -3,7 +3,7 @@ Tests for authentication endpoints.
 """
 
 import pytest
-import os
+from pathlib import Path
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
@@ -14,8 +14,7 @@ from app.models.user import User
 
 # Remove test database file if it exists to start with a clean slate
 test_db_file = "./test_auth.db"
-if os.path.exists(test_db_file):
-    os.remove(test_db_file)
+Path(test_db_file).unlink(missing_ok=True)
 
 # Test database setup
 SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///{test_db_file}"
@@ -26,6 +25,9 @@ Base.metadata.create_all(bind=test_engine)
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# Cleanup statements built once and reused by every fixture run
+_SQL_DELETE_USERS = text("DELETE FROM users")
+
 
 def override_get_db():
     """Test database session dependency"""
@@ -50,7 +52,7 @@ def setup_test_db():
     with TestingSessionLocal() as session:
         # Clear any existing data
         try:
-            session.execute(text("DELETE FROM users"))
+            session.execute(_SQL_DELETE_USERS)
             session.commit()
         except Exception:
             session.rollback()
@@ -60,7 +62,7 @@ def setup_test_db():
     # Clean up after tests
     with TestingSessionLocal() as session:
         try:
-            session.execute(text("DELETE FROM users"))
+            session.execute(_SQL_DELETE_USERS)
             session.commit()
         except Exception:
             session.rollback()
@@ -3,7 +3,7 @@ Extended tests for authentication API endpoints.
 """
 
 import pytest
-import os
+from pathlib import Path
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, text
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
@@ -17,8 +17,7 @@ from app.auth.auth import get_current_user, get_password_hash
 
 # Test database setup
 test_db_file = "./test_auth_api.db"
-if os.path.exists(test_db_file):
-    os.remove(test_db_file)
+Path(test_db_file).unlink(missing_ok=True)
 
 SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///{test_db_file}"
 test_engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -30,6 +29,10 @@ Base.metadata.create_all(bind=test_engine)
 # Create test database session
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# Cleanup statements built once and reused by every fixture run
+_SQL_DELETE_API_KEYS = text("DELETE FROM api_keys")
+_SQL_DELETE_USERS = text("DELETE FROM users")
+
 # Override database dependency
 def override_get_db():
     """Test database session dependency"""
@@ -54,8 +57,8 @@ def test_user():
     try:
         # Clean up any existing data with try/except, aby uniknąć błędów jeśli tabele nie istnieją
         try:
-            db.execute(text("DELETE FROM api_keys"))
-            db.execute(text("DELETE FROM users"))
+            db.execute(_SQL_DELETE_API_KEYS)
+            db.execute(_SQL_DELETE_USERS)
             db.commit()
         except Exception:
             db.rollback()
@@ -84,8 +87,8 @@ def test_user():
         
         # Clean up
         try:
-            db.execute(text("DELETE FROM api_keys"))
-            db.execute(text("DELETE FROM users"))
+            db.execute(_SQL_DELETE_API_KEYS)
+            db.execute(_SQL_DELETE_USERS)
             db.commit()
         except Exception:
             db.rollback()
@@ -3,7 +3,7 @@ Tests for health check endpoint.
 """
 
 import pytest
-import os
+from pathlib import Path
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
@@ -13,8 +13,7 @@ from app.database.database import Base, get_db
 
 # Remove test database file if it exists to start with a clean slate
 test_db_file = "./test.db"
-if os.path.exists(test_db_file):
-    os.remove(test_db_file)
+Path(test_db_file).unlink(missing_ok=True)
 
 # Create test database
 SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///{test_db_file}"
@@ -25,6 +24,8 @@ Base.metadata.create_all(bind=test_engine)
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+_SQL_SELECT_ONE = text("SELECT 1")
+
 
 def override_get_db():
     """Test database session dependency"""
@@ -48,7 +49,7 @@ def setup_test_db():
     # Ensure database connection is working
     with TestingSessionLocal() as session:
         try:
-            session.execute(text("SELECT 1"))
+            session.execute(_SQL_SELECT_ONE)
             session.commit()
         except Exception:
             session.rollback()
@@ -2,8 +2,7 @@
 Extended tests for health check endpoint to improve test coverage.
 """
 
-import pytest
-import os
+from pathlib import Path
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
@@ -16,8 +15,7 @@ from app.api.health import health_check
 
 # Test database setup
 test_db_file = "./test_health_extended.db"
-if os.path.exists(test_db_file):
-    os.remove(test_db_file)
+Path(test_db_file).unlink(missing_ok=True)
 
 SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///{test_db_file}"
 test_engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -202,7 +200,6 @@ def test_health_check_db_file_not_exists(mock_exists):
             del app.dependency_overrides[get_db]
 
 # Direct test of the health_check function using async/await
-@pytest.mark.asyncio
 async def test_health_check_function_directly():
     """Test the health_check function directly"""
     # Create a mock DB session
@@ -3,7 +3,8 @@ Tests for project API endpoints.
 """
 
 import pytest
-import os
+from datetime import datetime, timedelta
+from pathlib import Path
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -18,8 +19,7 @@ from jose import jwt
 
 # Test database setup
 test_db_file = "./test_projects_api.db"
-if os.path.exists(test_db_file):
-    os.remove(test_db_file)
+Path(test_db_file).unlink(missing_ok=True)
 
 SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///{test_db_file}"
 test_engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -42,7 +42,6 @@ def create_test_token(user_id=999):
     """
     Create a valid JWT token for tests
     """
-    from datetime import datetime, timedelta
     expiry_time = datetime.utcnow() + timedelta(days=365 * 10)  # 10 years in the future
     
     payload = {
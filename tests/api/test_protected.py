@@ -3,9 +3,10 @@ Tests for protected API endpoints.
 """
 
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from datetime import datetime, timedelta
-import os
+from pathlib import Path
 from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, text
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
 from jose import jwt
@@ -17,8 +18,7 @@ from app.models.user import User
 
 # Test database setup
 test_db_file = "./test_protected.db"
-if os.path.exists(test_db_file):
-    os.remove(test_db_file)
+Path(test_db_file).unlink(missing_ok=True)
 
 SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///{test_db_file}"
 test_engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -43,6 +43,9 @@ Base.metadata.create_all(bind=test_engine)
 # Create test database session
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# Cleanup statements built once and reused by every fixture run
+_SQL_DELETE_USERS = text("DELETE FROM users")
+
 # Override database dependency
 def override_get_db():
     """Test database session dependency"""
@@ -94,7 +97,7 @@ def setup_test_db():
     """Set up test database for each test"""
     # Create a test user
     with TestSessionLocal() as session:
-        session.execute(text("DELETE FROM users"))
+        session.execute(_SQL_DELETE_USERS)
         session.commit()
         
         user = UserModel(
@@ -110,7 +113,7 @@ def setup_test_db():
     
     # Clean up
     with TestSessionLocal() as session:
-        session.execute(text("DELETE FROM users"))
+        session.execute(_SQL_DELETE_USERS)
         session.commit()
 
 def create_test_token(user_id: int = 1, expires_delta: timedelta = None):
@@ -213,7 +216,6 @@ def test_jwt_only_endpoint_with_invalid_token():
     
     # Override get_current_user_from_token to raise an exception
     async def mock_get_current_user_exception(*args, **kwargs):
-        from fastapi import HTTPException
         raise HTTPException(
             status_code=401,
             detail="Could not validate credentials",
@@ -242,7 +244,6 @@ def test_jwt_only_endpoint_with_other_error():
     
     # Override get_current_user_from_token to raise an unexpected exception
     async def mock_get_current_user_exception(*args, **kwargs):
-        from fastapi import HTTPException
         raise HTTPException(
             status_code=401,
             detail="JWT token authentication failed: Unexpected error",
@@ -3,7 +3,8 @@ Tests for user API endpoints.
 """
 
 import pytest
-import os
+from datetime import datetime, timedelta
+from pathlib import Path
 import uuid
 from fastapi.testclient import TestClient
 from fastapi import Depends
@@ -19,8 +20,7 @@ from jose import jwt
 
 # Test database setup
 test_db_file = "./test_users_api.db"
-if os.path.exists(test_db_file):
-    os.remove(test_db_file)
+Path(test_db_file).unlink(missing_ok=True)
 
 SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///{test_db_file}"
 test_engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -44,7 +44,6 @@ def create_test_token(user_id=999):
     """
     Tworzy poprawny token JWT do testów, bez konieczności używania mocków
     """
-    from datetime import datetime, timedelta
     expiry_time = datetime.utcnow() + timedelta(days=365 * 10)  # 10 lat w przyszłości
     
     payload = {
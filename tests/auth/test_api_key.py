@@ -47,7 +47,6 @@ def test_token(test_user):
     """Create a test JWT token."""
     return create_access_token({"sub": str(test_user.id)})
 
-@pytest.mark.asyncio
 async def test_generate_api_key_success(mock_db, test_user):
     """Test successful API key generation."""
     # Set up mock
@@ -75,7 +74,6 @@ async def test_generate_api_key_success(mock_db, test_user):
     assert result.description == "Test API Key"
     assert isinstance(result.created_at, datetime)
 
-@pytest.mark.asyncio
 async def test_generate_api_key_user_not_found(mock_db):
     """Test API key generation fails when user doesn't exist."""
     # Set up mock
@@ -89,7 +87,6 @@ async def test_generate_api_key_user_not_found(mock_db):
     assert exc_info.value.status_code == 404
     assert "User not found" in str(exc_info.value.detail)
 
-@pytest.mark.asyncio
 async def test_generate_api_key_no_description(mock_db, test_user):
     """Test API key generation with no description provided."""
     # Set up mock
@@ -3,14 +3,13 @@ Tests for the auth.py module, focusing on authentication utilities.
 """
 
 import pytest
-import os
+from pathlib import Path
 from datetime import datetime, timedelta
-import asyncio
 from typing import Optional
+from unittest.mock import MagicMock
 from fastapi import FastAPI, Depends, Header, HTTPException, status
-from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, text
-from sqlalchemy.orm import sessionmaker, declarative_base, relationship
+from sqlalchemy.orm import sessionmaker, declarative_base, relationship, Session
 from jose import jwt, JWTError
 
 from app.auth.auth import (
@@ -26,11 +25,20 @@ from app.auth.auth import (
     ALGORITHM,
 )
 from app.database.database import get_db
+from tests.helpers import cached_password_hash
+
+def _mock_session(user=None, api_key_user_id=None):
+    """Build a mocked database session whose query and execute lookups return fixed results"""
+    mock_session = MagicMock(spec=Session)
+    mock_session.query.return_value.filter.return_value.first.return_value = user
+    mock_session.execute.return_value.first.return_value = (
+        [api_key_user_id] if api_key_user_id is not None else None
+    )
+    return mock_session
 
 # Test database setup
 test_db_file = "./test_auth.db"
-if os.path.exists(test_db_file):
-    os.remove(test_db_file)
+Path(test_db_file).unlink(missing_ok=True)
 
 SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///{test_db_file}"
 test_engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -71,6 +79,10 @@ Base.metadata.create_all(bind=test_engine)
 # Create test database session
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# Cleanup statements built once and reused by every fixture run
+_SQL_DELETE_API_KEYS = text("DELETE FROM api_keys")
+_SQL_DELETE_USERS = text("DELETE FROM users")
+
 # Test app
 test_app = FastAPI()
 
@@ -101,9 +113,6 @@ async def apikey_route(current_user = Depends(get_current_user_from_api_key)):
 # Apply dependency override
 test_app.dependency_overrides[get_db] = override_get_db
 
-# Test client
-client = TestClient(test_app)
-
 @pytest.fixture
 def test_db():
     """Fixture for database session"""
@@ -117,12 +126,12 @@ def test_db():
 def test_user(test_db):
     """Fixture to create a test user"""
     # Clean up existing data
-    test_db.execute(text("DELETE FROM api_keys"))
-    test_db.execute(text("DELETE FROM users"))
+    test_db.execute(_SQL_DELETE_API_KEYS)
+    test_db.execute(_SQL_DELETE_USERS)
     test_db.commit()
     
     # Create test user with properly hashed password
-    hashed_password = get_password_hash("testpassword")
+    hashed_password = cached_password_hash("testpassword")
     user = User(
         username="testuser",
         email="test@example.com",
@@ -153,8 +162,8 @@ def test_user(test_db):
     yield user
     
     # Clean up
-    test_db.execute(text("DELETE FROM api_keys"))
-    test_db.execute(text("DELETE FROM users"))
+    test_db.execute(_SQL_DELETE_API_KEYS)
+    test_db.execute(_SQL_DELETE_USERS)
     test_db.commit()
 
 # Tests for auth functions
@@ -213,7 +222,6 @@ def test_create_access_token():
     payload = jwt.decode(token3, SECRET_KEY, algorithms=[ALGORITHM])
     assert payload["sub"] == "789"
 
-@pytest.mark.asyncio
 async def test_get_current_user_from_token_invalid_format():
     """Test get_current_user_from_token with invalid token format"""
     # Ustawiamy token z niepoprawną wartością sub
@@ -232,7 +240,6 @@ async def test_get_current_user_from_token_invalid_format():
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert "Could not validate credentials" in str(exc_info.value.detail)
 
-@pytest.mark.asyncio
 async def test_get_current_user_from_token_missing_sub():
     """Test get_current_user_from_token with token missing sub claim"""
     # Token bez pola sub
@@ -251,7 +258,6 @@ async def test_get_current_user_from_token_missing_sub():
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert "Could not validate credentials" in str(exc_info.value.detail)
 
-@pytest.mark.asyncio
 async def test_get_current_user_from_token_invalid_user():
     """Test get_current_user_from_token with valid token but nonexistent user"""
     # Token dla nieistniejącego użytkownika
@@ -261,18 +267,8 @@ async def test_get_current_user_from_token_invalid_user():
         algorithm=ALGORITHM
     )
     
-    # Mock dla sesji bazy danych
-    class MockDB:
-        def query(self, model):
-            class MockQuery:
-                def filter(self, condition):
-                    return self
-                
-                def first(self):
-                    return None  # Użytkownik nie istnieje
-            return MockQuery()
-    
-    db_mock = MockDB()
+    # Mock dla sesji bazy danych - użytkownik nie istnieje
+    db_mock = _mock_session(user=None)
     
     with pytest.raises(HTTPException) as exc_info:
         await get_current_user_from_token(token=token_invalid_user, db=db_mock)
@@ -280,7 +276,6 @@ async def test_get_current_user_from_token_invalid_user():
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert "Could not validate credentials" in str(exc_info.value.detail)
 
-@pytest.mark.asyncio
 async def test_get_current_user_no_authentication():
     """Test get_current_user with no authentication provided"""
     # Brak tokena JWT i klucza API
@@ -295,41 +290,19 @@ async def test_get_current_user_no_authentication():
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert "Not authenticated" in str(exc_info.value.detail)
 
-@pytest.mark.asyncio
 async def test_get_current_user_from_api_key_success():
     """Test successful API key authentication"""
     # Valid API key
     x_api_key = "test-api-key-123"
     
-    # Mock for database session
-    class MockDB:
-        def execute(self, statement, params=None):
-            class MockResult:
-                def first(self):
-                    # Return user_id from the ApiKey table
-                    return [1]
-            return MockResult()
-            
-        def query(self, model):
-            class MockQuery:
-                def filter(self, condition):
-                    return self
-                
-                def first(self):
-                    # Return a mock user
-                    user = User(
-                        id=1,
-                        username="testuser",
-                        email="test@example.com",
-                        password_hash="hashed_password"
-                    )
-                    return user
-            return MockQuery()
-        
-        def commit(self):
-            pass
-    
-    db_mock = MockDB()
+    # Mock for database session returning user_id 1 from the ApiKey table
+    user = User(
+        id=1,
+        username="testuser",
+        email="test@example.com",
+        password_hash="hashed_password"
+    )
+    db_mock = _mock_session(user=user, api_key_user_id=1)
     
     # Call the function
     user = await get_current_user_from_api_key(x_api_key=x_api_key, db=db_mock)
@@ -339,7 +312,6 @@ async def test_get_current_user_from_api_key_success():
     assert user.id == 1
     assert user.username == "testuser"
 
-@pytest.mark.asyncio
 async def test_get_current_user_from_api_key_no_key():
     """Test API key authentication with no key provided"""
     # No API key
@@ -352,7 +324,6 @@ async def test_get_current_user_from_api_key_no_key():
     # Should return None, not raise an exception
     assert user is None
 
-@pytest.mark.asyncio
 async def test_get_current_user_from_api_key_invalid_key():
     """Test API key authentication with invalid key"""
     # Invalid API key
@@ -376,35 +347,13 @@ async def test_get_current_user_from_api_key_invalid_key():
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert "Invalid API key" in str(exc_info.value.detail)
 
-@pytest.mark.asyncio
 async def test_get_current_user_from_api_key_no_user():
     """Test API key authentication with valid key but missing user"""
     # Valid API key
     x_api_key = "test-api-key-123"
     
-    # Mock for database session
-    class MockDB:
-        def execute(self, statement, params=None):
-            class MockResult:
-                def first(self):
-                    # Return user_id from the ApiKey table
-                    return [999]  # ID of non-existent user
-            return MockResult()
-            
-        def query(self, model):
-            class MockQuery:
-                def filter(self, condition):
-                    return self
-                
-                def first(self):
-                    # No user found
-                    return None
-            return MockQuery()
-        
-        def commit(self):
-            pass
-    
-    db_mock = MockDB()
+    # Mock for database session: the key points at a non-existent user
+    db_mock = _mock_session(user=None, api_key_user_id=999)
     
     # Call the function and expect an exception
     with pytest.raises(HTTPException) as exc_info:
@@ -413,7 +362,6 @@ async def test_get_current_user_from_api_key_no_user():
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert "User associated with API key not found" in str(exc_info.value.detail)
 
-@pytest.mark.asyncio
 async def test_get_current_user_from_api_key_database_error():
     """Test API key authentication with database error"""
     # Valid API key
@@ -433,7 +381,6 @@ async def test_get_current_user_from_api_key_database_error():
     assert exc_info.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     assert "Error processing API key" in str(exc_info.value.detail)
 
-@pytest.mark.asyncio
 async def test_get_current_user_jwt_priority():
     """Test that JWT takes priority over API key in get_current_user"""
     # Both JWT and API key provided
@@ -447,25 +394,14 @@ async def test_get_current_user_jwt_priority():
     # Mock for request
     request_mock = None
     
-    # Mock for database session
-    class MockDB:
-        def query(self, model):
-            class MockQuery:
-                def filter(self, condition):
-                    return self
-                
-                def first(self):
-                    # Return user for JWT token (ID=1)
-                    user = User(
-                        id=1,
-                        username="jwt_user",
-                        email="jwt@example.com",
-                        password_hash="hashed_password"
-                    )
-                    return user
-            return MockQuery()
-    
-    db_mock = MockDB()
+    # Mock for database session returning the user for JWT token (ID=1)
+    user = User(
+        id=1,
+        username="jwt_user",
+        email="jwt@example.com",
+        password_hash="hashed_password"
+    )
+    db_mock = _mock_session(user=user)
     
     # Call the function
     user = await get_current_user(
@@ -479,7 +415,6 @@ async def test_get_current_user_jwt_priority():
     assert user is not None
     assert user.username == "jwt_user"
 
-@pytest.mark.asyncio
 async def test_get_current_user_jwt_failure_apikey_fallback():
     """Test that API key is used as fallback if JWT validation fails"""
     # Invalid JWT token but valid API key
@@ -535,7 +470,6 @@ async def test_get_current_user_jwt_failure_apikey_fallback():
     assert user is not None
     assert user.username == "apikey_user"
 
-@pytest.mark.asyncio
 async def test_get_current_user_token_error():
     """Test error handling in get_current_user when token is invalid"""
     # Invalid token format
@@ -3,14 +3,16 @@ Tests for authentication middleware.
 """
 
 import pytest
-import os
-import asyncio
 from fastapi import Depends, FastAPI, HTTPException, status, Header
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, text
-from sqlalchemy.orm import sessionmaker, relationship, declarative_base, Session
+from sqlalchemy import create_engine, event, insert, Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy.orm import relationship, declarative_base, Session
+from sqlalchemy.pool import StaticPool
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
+from unittest.mock import MagicMock
 
 from app.auth.auth import (
     get_current_user,
@@ -18,9 +20,15 @@ from app.auth.auth import (
     get_password_hash,
     verify_password,
     authenticate_user,
-    pwd_context,
 )
 from app.database.database import get_db
+from tests.helpers import set_sqlite_test_pragmas
+
+# Password hash computed once at import and shared by fixtures and password tests
+_TEST_PW_HASH = get_password_hash("testpassword")
+
+# Fixture timestamp; no test depends on its exact value
+_NOW = datetime.utcnow()
 
 # Create wrapper for create_access_token to handle the user_id parameter
 def create_access_token(data: dict = None, user_id: int = None, expires_delta: Optional[timedelta] = None) -> str:
@@ -31,10 +39,30 @@ def create_access_token(data: dict = None, user_id: int = None, expires_delta: O
         data["sub"] = user_id
     return original_create_access_token(data=data, expires_delta=expires_delta)
 
+@lru_cache(maxsize=128)
+def _cached_access_token(user_id: int, expires_seconds: Optional[int] = None) -> str:
+    """Memoized token creation for tests that only inspect the token shape"""
+    expires_delta = timedelta(seconds=expires_seconds) if expires_seconds else None
+    return create_access_token(user_id=user_id, expires_delta=expires_delta)
+
+# Canonical tokens signed once at import
+_TOKEN_NO_SUB = create_access_token(data={"username": "testuser"})
+_TOKEN_USER42 = _cached_access_token(42)
+_TOKEN_EXPIRED = create_access_token(user_id=1, expires_delta=timedelta(hours=-1))  # Expired one hour ago
+
 # Create aliases for testing - in your tests, you're expecting these functions to exist
 # but they don't in the current implementation, so we'll create aliases to the existing function
 get_current_user_from_token = get_current_user_from_jwt = get_current_user
 
+# Canned API key failures, keyed by the header value the tests send
+_API_KEY_ERRORS = {
+    "revoked-api-key-123456": (status.HTTP_401_UNAUTHORIZED, "Invalid API key"),
+    # For tests that expect errors with nonexistent users
+    "nonexistent-user-key": (status.HTTP_401_UNAUTHORIZED, "User associated with API key not found"),
+    # For tests that expect database errors
+    "any-api-key": (status.HTTP_500_INTERNAL_SERVER_ERROR, "Error processing API key: Simulated database error"),
+}
+
 # For API key auth, we need a proper implementation to handle the tests
 async def get_current_user_from_api_key(
     x_api_key: Optional[str] = Header(None),
@@ -43,38 +71,23 @@ async def get_current_user_from_api_key(
     """Mock implementation of API key authentication for tests"""
     if not x_api_key:
         return None
-        
-    if x_api_key == "revoked-api-key-123456":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid API key",
-        )
-        
-    # For tests that expect errors with nonexistent users
-    if x_api_key == "nonexistent-user-key":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User associated with API key not found",
-        )
-        
-    # For tests that expect database errors
-    if x_api_key == "any-api-key":
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error processing API key: Simulated database error",
-        )
+    
+    error = _API_KEY_ERRORS.get(x_api_key)
+    if error:
+        raise HTTPException(status_code=error[0], detail=error[1])
         
     # For valid API keys in normal tests, this would return a user
     # Most tests are marked as xfail anyway because of model mismatches
     return None
 
-# Test database setup
-test_db_file = "./test_auth_middleware.db"
-if os.path.exists(test_db_file):
-    os.remove(test_db_file)
-
-SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///{test_db_file}"
-test_engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+# Test database setup - in-memory SQLite shared through a single pooled connection
+SQLALCHEMY_TEST_DATABASE_URL = "sqlite://"
+test_engine = create_engine(
+    SQLALCHEMY_TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+event.listen(test_engine, "connect", set_sqlite_test_pragmas)
 
 # Create base model for test - using SQLAlchemy 2.0 style
 Base = declarative_base()
@@ -106,23 +119,14 @@ class ApiKeyModel(Base):
     
     user = relationship("UserModel", back_populates="api_keys")
 
-# Create all tables in the test database
-Base.metadata.create_all(bind=test_engine)
-
-# Create test database session
-TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-
 # Create test app - renamed to avoid pytest collection
 app_for_testing = FastAPI()
 
 # Override database dependency for tests
 def override_get_db():
     """Override database dependency for testing"""
-    try:
-        db = TestSessionLocal()
+    with Session(test_engine) as db:
         yield db
-    finally:
-        db.close()
 
 # Create test endpoints
 @app_for_testing.get("/protected")
@@ -148,68 +152,112 @@ async def api_key_only_route(current_user: UserModel = Depends(get_current_user_
 # Apply dependency override
 app_for_testing.dependency_overrides[get_db] = override_get_db
 
-# Create TestClient - update client to use the renamed app
-client = TestClient(app_for_testing)
+@pytest.fixture(scope="module")
+def client():
+    """TestClient shared by the module, entered once so the ASGI lifespan runs a single time"""
+    with TestClient(app_for_testing) as test_client:
+        yield test_client
+
+@pytest.fixture(scope="module", autouse=True)
+def _schema():
+    """Create the test tables once for the module and drop them afterwards"""
+    Base.metadata.create_all(bind=test_engine)
+    yield
+    Base.metadata.drop_all(bind=test_engine)
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def test_user():
-    """Fixture to create a test user"""
-    with TestSessionLocal() as db:
-        # Clean up existing data
-        db.execute(text("DELETE FROM api_keys"))
-        db.execute(text("DELETE FROM users"))
-        db.commit()
-        
-        # Create test user
-        user = UserModel(
-            username="testuser",
-            email="test@example.com",
-            password_hash="$2b$12$Q7PJ9bpBSeSbhqE0GJTO5eQZgq0PoVKV16jjfQbkallKjWQofl/q2"  # "testpassword"
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        
-        # Create API key for the user
-        api_key = ApiKeyModel(
-            user_id=user.id,
-            key_value="test-api-key-123456",
-            description="Test API key",
-            created_at=datetime.utcnow()
-        )
-        db.add(api_key)
-        
-        # Create revoked API key
-        revoked_api_key = ApiKeyModel(
-            user_id=user.id,
-            key_value="revoked-api-key-123456",
-            description="Revoked test API key",
-            created_at=datetime.utcnow(),
-            revoked=True
-        )
-        db.add(revoked_api_key)
-        db.commit()
-        
-        yield user
-        
-        # Clean up data after test
-        db.execute(text("DELETE FROM api_keys"))
-        db.execute(text("DELETE FROM users"))
-        db.commit()
+    """Fixture to create a test user once for the whole module"""
+    connection = test_engine.connect()
+    db = Session(bind=connection)
+    
+    # The in-memory schema starts empty and is dropped after the module, so no cleanup runs here
+    
+    # Create test user, flushing only to obtain its id
+    user = UserModel(
+        username="testuser",
+        email="test@example.com",
+        password_hash=_TEST_PW_HASH
+    )
+    db.add(user)
+    db.flush()
+    
+    # Create active and revoked API keys for the user in a single executemany
+    db.execute(insert(ApiKeyModel), [
+        {
+            "user_id": user.id,
+            "key_value": "test-api-key-123456",
+            "description": "Test API key",
+            "created_at": _NOW,
+            "revoked": False,
+        },
+        {
+            "user_id": user.id,
+            "key_value": "revoked-api-key-123456",
+            "description": "Revoked test API key",
+            "created_at": _NOW,
+            "revoked": True,
+        },
+    ])
+    
+    # Single commit for the whole setup
+    db.commit()
+    
+    yield user
+    
+    db.close()
+    connection.close()
+
+@pytest.fixture(scope="module")
+def user_token(test_user):
+    """Token for the module's test user, signed once after the user exists"""
+    return create_access_token(user_id=test_user.id)
+
+def _make_mock_db(user=None, raise_exc=None, api_key_user_id=None):
+    """Build a mocked database session for dependency overrides"""
+    mock_db = MagicMock(spec=Session)
+    if raise_exc is not None:
+        mock_db.execute.side_effect = raise_exc
+        mock_db.query.side_effect = raise_exc
+        return mock_db
+    
+    mock_db.query.return_value.filter.return_value.first.return_value = user
+    mock_db.execute.return_value.first.return_value = (
+        [api_key_user_id] if api_key_user_id is not None else None
+    )
+    return mock_db
+
+@contextmanager
+def _override_dependency(app, dependency, override):
+    """Temporarily override a dependency, restoring the previous override on exit"""
+    previous = app.dependency_overrides.get(dependency)
+    app.dependency_overrides[dependency] = override
+    try:
+        yield
+    finally:
+        if previous is not None:
+            app.dependency_overrides[dependency] = previous
+        else:
+            app.dependency_overrides.pop(dependency, None)
+
+def _mock_get_db(mock_db):
+    """Wrap a mocked session in a get_db-style generator dependency"""
+    def mock_get_db():
+        yield mock_db
+    return mock_get_db
 
-def test_access_without_auth():
+def test_access_without_auth(client):
     """Test accessing protected route without authentication"""
     response = client.get("/protected")
     assert response.status_code == 401
     assert "Not authenticated" in response.text
 
 @pytest.mark.xfail(reason="Integration test will fail with current test setup due to model mismatch")
-def test_access_with_jwt_token(test_user):
+def test_access_with_jwt_token(client, test_user, user_token):
     """Test accessing a protected route with JWT token"""
-    access_token = create_access_token(user_id=test_user.id)
     response = client.get(
         "/protected",
-        headers={"Authorization": f"Bearer {access_token}"}
+        headers={"Authorization": f"Bearer {user_token}"}
     )
     
     # This might fail due to model mismatch in a test environment
@@ -217,38 +265,55 @@ def test_access_with_jwt_token(test_user):
     assert response.json().get("message") == "Authenticated"
     assert response.json().get("user_id") == test_user.id
 
-@pytest.mark.xfail(reason="Integration test will fail with current test setup due to model mismatch")
-def test_access_with_api_key(test_user):
-    """Test accessing a protected route with API key"""
-    response = client.get(
-        "/protected",
-        headers={"x-api-key": "test-api-key-123456"}
-    )
-    
-    # This might fail due to model mismatch in a test environment
-    assert response.status_code == 200
-    assert response.json().get("message") == "Authenticated"
-
-@pytest.mark.xfail(reason="Integration test will fail with current test setup due to model mismatch")
-def test_access_with_revoked_api_key(test_user):
-    """Test accessing a protected route with a revoked API key"""
-    response = client.get(
-        "/protected",
-        headers={"x-api-key": "revoked-api-key-123456"}
+@pytest.mark.parametrize(
+    "path,api_key,make_mock_db,status_code,detail",
+    [
+        pytest.param(
+            "/protected", "test-api-key-123456", None, 200, None,
+            marks=pytest.mark.xfail(reason="Integration test will fail with current test setup due to model mismatch"),
+            id="valid_key",
+        ),
+        pytest.param(
+            "/protected", "revoked-api-key-123456", None, 401, "Invalid API key",
+            marks=pytest.mark.xfail(reason="Integration test will fail with current test setup due to model mismatch"),
+            id="revoked_key",
+        ),
+        pytest.param(
+            "/api-key-only", "nonexistent-user-key", lambda: _make_mock_db(api_key_user_id=999999),
+            401, "User associated with API key not found",
+            id="nonexistent_user",
+        ),
+        pytest.param(
+            "/api-key-only", "any-api-key", lambda: _make_mock_db(raise_exc=Exception("Simulated database error")),
+            500, "Error processing API key",
+            id="database_error",
+        ),
+        pytest.param("/api-key-only", None, None, 401, "API key required", id="empty_key"),
+    ],
+)
+def test_api_key_matrix(client, test_user, path, api_key, make_mock_db, status_code, detail):
+    """Test API key authentication outcomes for valid, revoked, orphaned, failing and missing keys"""
+    headers = {"x-api-key": api_key} if api_key else {}
+    
+    override = (
+        _override_dependency(app_for_testing, get_db, _mock_get_db(make_mock_db()))
+        if make_mock_db is not None
+        else nullcontext()
     )
+    with override:
+        response = client.get(path, headers=headers)
     
-    assert response.status_code == 401
-    assert "Invalid API key" in response.json()["detail"]
+    assert response.status_code == status_code
+    if detail is None:
+        assert response.json().get("message") == "Authenticated"
+    else:
+        assert detail in response.json()["detail"]
 
-def test_expired_token(test_user):
+def test_expired_token(client):
     """Test accessing a protected route with an expired token"""
-    # Create token that expired one hour ago
-    expires_delta = timedelta(hours=-1)
-    expired_token = create_access_token(user_id=test_user.id, expires_delta=expires_delta)
-    
     response = client.get(
         "/protected",
-        headers={"Authorization": f"Bearer {expired_token}"}
+        headers={"Authorization": f"Bearer {_TOKEN_EXPIRED}"}
     )
     
     assert response.status_code == 401
@@ -257,12 +322,8 @@ def test_expired_token(test_user):
 # New tests for password functionality
 def test_verify_password():
     """Test password verification function"""
-    plain_password = "TestPassword123"
-    wrong_password = "WrongPassword123"
-    hashed_password = get_password_hash(plain_password)
-    
-    assert verify_password(plain_password, hashed_password)
-    assert not verify_password(wrong_password, hashed_password)
+    assert verify_password("testpassword", _TEST_PW_HASH)
+    assert not verify_password("wrongpassword", _TEST_PW_HASH)
 
 def test_get_password_hash():
     """Test password hashing function"""
@@ -278,44 +339,34 @@ def test_get_password_hash():
     assert hashed_password != other_hash
 
 # Additional tests for token creation
-def test_create_access_token_with_data():
-    """Test creating an access token with arbitrary data"""
-    test_data = {"sub": 123, "role": "admin"}
-    token = create_access_token(data=test_data)
-    assert token is not None
-    assert isinstance(token, str)
-    assert len(token) > 20
-
-def test_create_access_token_with_user_id():
-    """Test creating an access token with a user ID"""
-    user_id = 42
-    token = create_access_token(user_id=user_id)
-    assert token is not None
-    assert isinstance(token, str)
-    assert len(token) > 20
-
-def test_create_access_token_with_custom_expiry():
-    """Test creating an access token with a custom expiry time"""
-    user_id = 42
-    expires_delta = timedelta(hours=5)  # 5 hours from now
-    token = create_access_token(user_id=user_id, expires_delta=expires_delta)
-    assert token is not None
+@pytest.mark.parametrize(
+    "make_token",
+    [
+        lambda: create_access_token(data={"sub": 123, "role": "admin"}),
+        lambda: _TOKEN_USER42,
+        lambda: _cached_access_token(42, expires_seconds=5 * 3600),  # 5 hours from now
+    ],
+    ids=["with_data", "with_user_id", "with_custom_expiry"],
+)
+def test_create_access_token(make_token):
+    """Test creating an access token from data, a user ID, or a custom expiry time"""
+    token = make_token()
     assert isinstance(token, str)
     assert len(token) > 20
 
 @pytest.mark.xfail(reason="Integration test will fail with current test setup due to model mismatch")
 def test_authenticate_user_success(test_user):
     """Test successful user authentication"""
-    with TestSessionLocal() as db:
+    with Session(test_engine) as db:
         # Because we're using a different model in tests than in the actual code
         result = authenticate_user(db, "test@example.com", "testpassword")
         assert result is not False
-        assert getattr(result, "id", None) is not None
-        assert getattr(result, "email", None) == "test@example.com"
+        assert result.id is not None
+        assert result.email == "test@example.com"
 
 def test_authenticate_user_failure(test_user):
     """Test failed user authentication"""
-    with TestSessionLocal() as db:
+    with Session(test_engine) as db:
         # Wrong password
         result = authenticate_user(db, "test@example.com", "wrongpassword")
         assert result is False
@@ -325,7 +376,7 @@ def test_authenticate_user_failure(test_user):
         assert result is False
 
 # Test invalid JWT token
-def test_invalid_jwt_format():
+def test_invalid_jwt_format(client):
     """Test accessing a protected route with an invalid JWT format"""
     response = client.get(
         "/protected",
@@ -335,112 +386,8 @@ def test_invalid_jwt_format():
     assert response.status_code == 401
     assert "Could not validate credentials" in response.json()["detail"]
 
-# Test API key with non-existent user
-def test_api_key_nonexistent_user(test_user):
-    """Test API key with non-existent user"""
-    class MockApiKeyResult:
-        def first(self):
-            return [999999]  # Zwróć ID nieistniejącego użytkownika
-        
-    class MockUserResult:
-        def first(self):
-            return None  # Użytkownik nie istnieje
-    
-    # Tworzenie mocka dla sesji bazy danych
-    class MockSession:
-        def __init__(self):
-            pass
-        
-        def query(self, model):
-            class MockQuery:
-                def filter(self, condition):
-                    return self
-                
-                def first(self):
-                    return None  # Symulacja braku użytkownika
-            return MockQuery()
-        
-        def execute(self, statement, params=None):
-            if "SELECT user_id FROM api_keys" in str(statement):
-                return MockApiKeyResult()
-            return MockUserResult()
-        
-        def commit(self):
-            pass
-    
-    # Podmiana zależności bazy danych
-    def mock_get_db():
-        try:
-            yield MockSession()
-        finally:
-            pass
-    
-    # Zapisanie oryginalnej zależności
-    original_override = app_for_testing.dependency_overrides.get(get_db)
-    
-    try:
-        # Zastosowanie mocka
-        app_for_testing.dependency_overrides[get_db] = mock_get_db
-        
-        response = client.get(
-            "/api-key-only",
-            headers={"x-api-key": "nonexistent-user-key"}
-        )
-        
-        assert response.status_code == 401
-        assert "User associated with API key not found" in response.json()["detail"]
-    finally:
-        # Przywrócenie oryginalnej zależności
-        if original_override:
-            app_for_testing.dependency_overrides[get_db] = original_override
-        else:
-            del app_for_testing.dependency_overrides[get_db]
-
-# Additional tests for API key authentication error handling
-def test_api_key_general_exception():
-    """Test handling of general exceptions in API key authentication"""
-    class ExceptionRaisingSession:
-        def __init__(self):
-            pass
-            
-        def execute(self, *args, **kwargs):
-            raise Exception("Simulated database error")
-            
-        def query(self, *args, **kwargs):
-            raise Exception("Simulated query error")
-    
-    # Mock dependency
-    def mock_get_db():
-        try:
-            yield ExceptionRaisingSession()
-        finally:
-            pass
-    
-    # Store original override
-    original_override = app_for_testing.dependency_overrides.get(get_db)
-    
-    try:
-        # Apply mock
-        app_for_testing.dependency_overrides[get_db] = mock_get_db
-        
-        # Test with API key
-        response = client.get(
-            "/api-key-only",
-            headers={"x-api-key": "any-api-key"}
-        )
-        
-        # Verify response
-        assert response.status_code == 500
-        assert "Error processing API key" in response.json()["detail"]
-    finally:
-        # Restore original dependency
-        if original_override:
-            app_for_testing.dependency_overrides[get_db] = original_override
-        else:
-            del app_for_testing.dependency_overrides[get_db]
-
 # Test the unified get_current_user function
-def test_no_authentication():
+def test_no_authentication(client):
     """Test accessing a protected route with no authentication"""
     response = client.get("/protected")
     
@@ -449,155 +396,59 @@ def test_no_authentication():
     assert response.headers.get("www-authenticate") == "Bearer"
 
 @pytest.mark.xfail(reason="Integration test will fail with current test setup due to model mismatch")
-def test_auth_priority_token_over_api_key(test_user):
+def test_auth_priority_token_over_api_key(client, test_user, user_token):
     """Test that token authentication takes priority over API key"""
-    class MockSession:
-        def __init__(self):
-            self.user = UserModel(
-                id=test_user.id, 
-                username="testuser",
-                email="test@example.com",
-                password_hash="hashed_password"
-            )
-    
-        def query(self, model):
-            class MockQuery:
-                def __init__(self_, *args, **kwargs):
-                    self_.self = self_
-                    
-                def filter(self_, *args, **kwargs):
-                    return self_
-                    
-                def first(self_):
-                    return self.user
-            return MockQuery()
-            
-        def execute(self, statement, params=None):
-            class MockResult:
-                def first(self):
-                    return [test_user.id]
-            return MockResult()
-            
-        def commit(self):
-            pass
-    
-    # Mock dependency
-    def mock_get_db():
-        try:
-            yield MockSession()
-        finally:
-            pass
-    
-    # Store original override
-    original_override = app_for_testing.dependency_overrides.get(get_db)
+    user = UserModel(
+        id=test_user.id,
+        username="testuser",
+        email="test@example.com",
+        password_hash="hashed_password"
+    )
+    mock_db = _make_mock_db(user=user, api_key_user_id=test_user.id)
     
-    try:
-        # Apply mock
-        app_for_testing.dependency_overrides[get_db] = mock_get_db
-        
-        # Create valid token
-        access_token = create_access_token(user_id=test_user.id)
-        
+    with _override_dependency(app_for_testing, get_db, _mock_get_db(mock_db)):
         # Test with both token and API key
         response = client.get(
             "/protected",
             headers={
-                "Authorization": f"Bearer {access_token}",
+                "Authorization": f"Bearer {user_token}",
                 "x-api-key": "any-api-key"
             }
         )
-        
-        # If token authentication takes priority, this should succeed
-        assert response.status_code == 200
-        assert response.json()["message"] == "Authenticated"
-        assert response.json()["user_id"] == test_user.id
-    finally:
-        # Restore original dependency
-        if original_override:
-            app_for_testing.dependency_overrides[get_db] = original_override
-        else:
-            del app_for_testing.dependency_overrides[get_db]
+    
+    # If token authentication takes priority, this should succeed
+    assert response.status_code == 200
+    assert response.json()["message"] == "Authenticated"
+    assert response.json()["user_id"] == test_user.id
 
 @pytest.mark.xfail(reason="Integration test will fail with current test setup due to model mismatch")
-def test_get_current_user_api_key_fallback(test_user):
+def test_get_current_user_api_key_fallback(client, test_user):
     """Test API key authentication as fallback when no token is provided"""
-    class MockSession:
-        def __init__(self):
-            self.user = UserModel(
-                id=test_user.id, 
-                username="testuser",
-                email="test@example.com",
-                password_hash="hashed_password"
-            )
-    
-        def query(self, model):
-            class MockQuery:
-                def __init__(self_, *args, **kwargs):
-                    self_.self = self_
-                    
-                def filter(self_, *args, **kwargs):
-                    return self_
-                    
-                def first(self_):
-                    return self.user
-            return MockQuery()
-            
-        def execute(self, statement, params=None):
-            class MockResult:
-                def first(self):
-                    return [test_user.id]
-            return MockResult()
-            
-        def commit(self):
-            pass
-    
-    # Mock dependency
-    def mock_get_db():
-        try:
-            yield MockSession()
-        finally:
-            pass
-    
-    # Store original override
-    original_override = app_for_testing.dependency_overrides.get(get_db)
+    user = UserModel(
+        id=test_user.id,
+        username="testuser",
+        email="test@example.com",
+        password_hash="hashed_password"
+    )
+    mock_db = _make_mock_db(user=user, api_key_user_id=test_user.id)
     
-    try:
-        # Apply mock
-        app_for_testing.dependency_overrides[get_db] = mock_get_db
-        
+    with _override_dependency(app_for_testing, get_db, _mock_get_db(mock_db)):
         # Test with only API key (no token)
         response = client.get(
             "/protected",
             headers={"x-api-key": "test-api-key"}
         )
-        
-        # Should succeed with API key authentication
-        assert response.status_code == 200
-        assert response.json()["message"] == "Authenticated"
-        assert response.json()["user_id"] == test_user.id
-    finally:
-        # Restore original dependency
-        if original_override:
-            app_for_testing.dependency_overrides[get_db] = original_override
-        else:
-            del app_for_testing.dependency_overrides[get_db]
-
-def test_empty_api_key():
-    """Test that an empty API key returns None without error"""
-    response = client.get("/api-key-only")
     
-    # This should fail since the route requires authentication
-    assert response.status_code == 401
-    assert "API key required" in response.json()["detail"]
+    # Should succeed with API key authentication
+    assert response.status_code == 200
+    assert response.json()["message"] == "Authenticated"
+    assert response.json()["user_id"] == test_user.id
 
-def test_invalid_jwt_missing_sub_claim():
+def test_invalid_jwt_missing_sub_claim(client):
     """Test token with missing sub claim"""
-    # Create token without sub claim
-    token_without_sub = create_access_token(data={"username": "testuser"})
-    
     response = client.get(
         "/jwt-only",
-        headers={"Authorization": f"Bearer {token_without_sub}"}
+        headers={"Authorization": f"Bearer {_TOKEN_NO_SUB}"}
     )
     
     assert response.status_code == 401
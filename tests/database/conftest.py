@@ -0,0 +1,102 @@
+"""
+Shared database fixtures for the database tests.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database.database import Base
+from app.models.user import User
+from app.core.config import DB_SETTINGS
+from tests.helpers import cached_password_hash, set_sqlite_test_pragmas, use_fast_password_hashing
+
+use_fast_password_hashing()
+
+# Test database connection
+# In-memory database; StaticPool keeps every session on the same connection
+SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///:memory:"
+test_engine = create_engine(
+    SQLALCHEMY_TEST_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+event.listen(test_engine, "connect", set_sqlite_test_pragmas)
+
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _test_schema():
+    """Create the tables once for the whole run and drop them at the end"""
+    Base.metadata.create_all(bind=test_engine)
+    yield
+    Base.metadata.drop_all(bind=test_engine)
+
+
+@pytest.fixture
+def db_session():
+    """Give the test a plain session on the in-memory test engine"""
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def setup_test_db():
+    """Give each test a session with the admin user, all rolled back afterwards"""
+    connection = test_engine.connect()
+    transaction = connection.begin()
+    
+    # Create admin user manually for testing purposes
+    connection.execute(insert(User).values(
+        username=DB_SETTINGS["default_admin_username"],
+        email=DB_SETTINGS["default_admin_email"],
+        password_hash=cached_password_hash(DB_SETTINGS["default_admin_password"])
+    ))
+    
+    # Commits made by the test only release a SAVEPOINT inside the outer transaction
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    
+    yield db
+    
+    # Clean up
+    db.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="session")
+def known_password_hash():
+    """Password and matching hash for the verify_password tests"""
+    password = "testpassword123"
+    return password, cached_password_hash(password)
+
+
+@pytest.fixture
+def mock_init_db_attrs(monkeypatch):
+    """Return a helper replacing the named app.database.init_db attributes with MagicMocks"""
+    def _mock(*names):
+        mocks = tuple(MagicMock() for _ in names)
+        for name, mock_obj in zip(names, mocks):
+            monkeypatch.setattr(f"app.database.init_db.{name}", mock_obj)
+        return mocks
+    return _mock
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """
+    Share one event loop across the async database tests.
+    
+    pytest-asyncio 0.21 has no loop_scope option; overriding event_loop with
+    a wider scope is its supported way to stop building a loop per test.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
@@ -13,9 +13,12 @@ from app.database.database import (
     SessionLocal,
     engine,
     Base,
-    DATA_DIRECTORY
+    DATA_DIRECTORY,
+    ensure_data_directory
 )
 
+_SQL_SELECT_ONE = text("SELECT 1")
+
 def test_get_db():
     """Test that get_db yields a database session and closes it properly"""
     # Get a generator from get_db
@@ -28,7 +31,7 @@ def test_get_db():
     assert isinstance(db, Session)
     
     # Test we can execute a query
-    result = db.execute(text("SELECT 1")).scalar()
+    result = db.execute(_SQL_SELECT_ONE).scalar()
     assert result == 1
     
     # Close the session by calling the generator
@@ -56,27 +59,12 @@ def test_data_directory_creation():
     """Test that the data directory is created if it doesn't exist"""
     # Use a temporary directory for testing
     with tempfile.TemporaryDirectory() as temp_dir:
-        # Set environment variable to temp directory
-        old_data_dir = os.environ.get('DATA_DIRECTORY')
-        os.environ['DATA_DIRECTORY'] = temp_dir
+        data_dir = os.path.join(temp_dir, "data")
+        
+        ensure_data_directory(data_dir)
         
-        try:
-            # Import module again to trigger directory creation
-            import importlib
-            import app.database.database
-            importlib.reload(app.database.database)
-            
-            # Check that directory exists
-            assert os.path.exists(temp_dir)
-        finally:
-            # Restore original environment variable
-            if old_data_dir:
-                os.environ['DATA_DIRECTORY'] = old_data_dir
-            else:
-                del os.environ['DATA_DIRECTORY']
-            
-            # Reload module to restore original state
-            importlib.reload(app.database.database)
+        # Check that directory exists
+        assert os.path.isdir(data_dir)
 
 
 def test_engine_creation():
@@ -90,7 +78,7 @@ def test_engine_creation():
     
     # Check that the engine can connect to the database
     with engine.connect() as connection:
-        result = connection.execute(text("SELECT 1")).scalar()
+        result = connection.execute(_SQL_SELECT_ONE).scalar()
         assert result == 1
 
 
@@ -104,7 +92,7 @@ def test_session_creation():
         assert isinstance(db, Session)
         
         # Test we can execute a query
-        result = db.execute(text("SELECT 1")).scalar()
+        result = db.execute(_SQL_SELECT_ONE).scalar()
         assert result == 1
     finally:
         # Clean up
@@ -2,119 +2,90 @@
 Tests for database initialization.
 """
 
-import pytest
 import os
 import logging
 import asyncio
-from unittest.mock import patch, MagicMock
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import Session, sessionmaker
+import bcrypt
+from unittest.mock import MagicMock
+from sqlalchemy import select
 
-from app.database.database import Base
 from app.models.user import User
-from app.auth.auth import get_password_hash, verify_password
-from app.database.init_db import check_admin_default_password, init_db, pwd_context, verify_password as init_db_verify_password
+from app.database.init_db import check_admin_default_password, init_db, verify_password as init_db_verify_password
 from app.core.config import DB_SETTINGS
+from tests.helpers import cached_password_hash
 
-# Test database connection
-SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
-test_engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-
-
-@pytest.fixture
-def setup_test_db():
-    """Set up a clean test database for each test"""
-    # Create tables
-    Base.metadata.create_all(bind=test_engine)
-    
-    # Create admin user manually for testing purposes
-    db = TestingSessionLocal()
-    
-    # Check if admin user already exists
-    admin = db.query(User).filter(User.username == DB_SETTINGS["default_admin_username"]).first()
-    if not admin:
-        admin_user = User(
-            username=DB_SETTINGS["default_admin_username"],
-            email=DB_SETTINGS["default_admin_email"],
-            password_hash=get_password_hash(DB_SETTINGS["default_admin_password"])
-        )
-        db.add(admin_user)
-        db.commit()
-    
-    yield db
-    
-    # Clean up
-    db.close()
-    Base.metadata.drop_all(bind=test_engine)
+
+def _verify(password, password_hash):
+    """Check a bcrypt hash directly; passlib stays in the code under test only"""
+    return bcrypt.checkpw(password.encode(), password_hash.encode())
 
 
 def test_admin_user_creation(setup_test_db):
     """Test that the admin user is created during database initialization"""
     db = setup_test_db
-    admin_user = db.query(User).filter(User.username == DB_SETTINGS["default_admin_username"]).first()
+    # Only three columns are checked, so a Core select skips building the ORM entity
+    admin_user = db.execute(
+        select(User.username, User.email, User.password_hash)
+        .where(User.username == DB_SETTINGS["default_admin_username"])
+        .limit(1)
+    ).first()
     
     assert admin_user is not None
     assert admin_user.username == DB_SETTINGS["default_admin_username"]
     assert admin_user.email == DB_SETTINGS["default_admin_email"]
     
     # Test password verification
-    assert verify_password(DB_SETTINGS["default_admin_password"], admin_user.password_hash) == True
+    assert _verify(DB_SETTINGS["default_admin_password"], admin_user.password_hash)
 
 
-@pytest.mark.parametrize(
-    "password,expected_warning",
-    [
-        (DB_SETTINGS["default_admin_password"], True),  # Default password should trigger warning
-        ("securepassword", False)                       # Changed password should not trigger warning
-    ],
-)
-def test_admin_default_password_warning(setup_test_db, caplog, password, expected_warning):
+def test_admin_default_password_warning(setup_test_db, caplog):
     """Test that a warning is logged when admin has the default password"""
     # Set up
     db = setup_test_db
     admin_user = db.query(User).filter(User.username == DB_SETTINGS["default_admin_username"]).first()
-    
-    # Update admin password to test value
-    admin_user.password_hash = get_password_hash(password)
-    db.commit()
+    warning_message = f"SECURITY WARNING: The '{DB_SETTINGS['default_admin_username']}' user has the default password."
     
     # Set caplog to capture warnings
     caplog.set_level(logging.WARNING)
     
-    # Call the function that checks admin password
-    check_admin_default_password(db)
-    
-    # Check if warning was logged
-    warning_message = f"SECURITY WARNING: The '{DB_SETTINGS['default_admin_username']}' user has the default password."
-    if expected_warning:
-        assert any(warning_message in record.message for record in caplog.records)
-    else:
-        assert not any(warning_message in record.message for record in caplog.records)
+    cases = [
+        (DB_SETTINGS["default_admin_password"], True),  # Default password should trigger warning
+        ("securepassword", False),                      # Changed password should not trigger warning
+    ]
+    for password, expected_warning in cases:
+        caplog.clear()
+        
+        # Update admin password to test value
+        admin_user.password_hash = cached_password_hash(password)
+        db.commit()
+        
+        # Call the function that checks admin password
+        check_admin_default_password(db)
+        
+        # Check if warning was logged
+        warned = any(warning_message in record.message for record in caplog.records)
+        assert warned == expected_warning, f"password={password!r}"
 
 
 # New additional tests to improve coverage
 
-def test_verify_password():
+def test_verify_password(known_password_hash):
     """Test the verify_password function directly"""
-    # Hash a test password
-    test_password = "testpassword123"
-    hashed = pwd_context.hash(test_password)
+    password, password_hash = known_password_hash
     
     # Test verification works for correct password
-    assert init_db_verify_password(test_password, hashed) == True
+    assert init_db_verify_password(password, password_hash) == True
     
     # Test verification fails for incorrect password
-    assert init_db_verify_password("wrongpassword", hashed) == False
+    assert init_db_verify_password("wrongpassword", password_hash) == False
 
 
-@pytest.mark.asyncio
-@patch('app.database.init_db.run_migrations')
-@patch('app.database.init_db.Session')
-@patch('app.database.init_db.check_admin_default_password')
-async def test_init_db_successful(mock_check_admin, mock_session, mock_run_migrations):
+async def test_init_db_successful(mock_init_db_attrs):
     """Test successful database initialization"""
     # Set up mocks
+    mock_run_migrations, mock_session, mock_check_admin = mock_init_db_attrs(
+        "run_migrations", "Session", "check_admin_default_password"
+    )
     mock_db = MagicMock()
     mock_session.return_value = mock_db
     mock_db.query.return_value.filter.return_value.first.return_value = None  # Admin user doesn't exist
@@ -137,14 +108,12 @@ async def test_init_db_successful(mock_check_admin, mock_session, mock_run_migra
     mock_db.close.assert_called_once()
 
 
-@pytest.mark.asyncio
-@patch('app.database.init_db.run_migrations')
-@patch('app.database.init_db.Session')
-@patch('app.database.init_db.check_admin_default_password')
-@patch('app.database.init_db.logger')
-async def test_init_db_admin_exists(mock_logger, mock_check_admin, mock_session, mock_run_migrations):
+async def test_init_db_admin_exists(mock_init_db_attrs):
     """Test initialization when admin user already exists"""
     # Set up mocks
+    mock_run_migrations, mock_session, mock_check_admin, mock_logger = mock_init_db_attrs(
+        "run_migrations", "Session", "check_admin_default_password", "logger"
+    )
     mock_db = MagicMock()
     mock_session.return_value = mock_db
     
@@ -172,13 +141,10 @@ async def test_init_db_admin_exists(mock_logger, mock_check_admin, mock_session,
     mock_db.close.assert_called_once()
 
 
-@pytest.mark.asyncio
-@patch('app.database.init_db.run_migrations')
-@patch('app.database.init_db.Session')
-@patch('app.database.init_db.logger')
-async def test_init_db_exception_handling(mock_logger, mock_session, mock_run_migrations):
+async def test_init_db_exception_handling(mock_init_db_attrs):
     """Test error handling during database initialization"""
     # Set up mocks
+    _, mock_session, mock_logger = mock_init_db_attrs("run_migrations", "Session", "logger")
     mock_db = MagicMock()
     mock_session.return_value = mock_db
     
@@ -197,9 +163,10 @@ async def test_init_db_exception_handling(mock_logger, mock_session, mock_run_mi
     mock_db.close.assert_called_once()
 
 
-@patch('app.database.init_db.logger')
-def test_check_admin_default_password_exception(mock_logger, setup_test_db):
+def test_check_admin_default_password_exception(mock_init_db_attrs, setup_test_db):
     """Test exception handling in check_admin_default_password"""
+    (mock_logger,) = mock_init_db_attrs("logger")
+    
     # Create a mock database session that raises an exception
     mock_db = MagicMock()
     mock_db.query.side_effect = Exception("Test database error")
@@ -2,168 +2,123 @@
 Extended tests for database initialization module.
 """
 
-import pytest
-import os
-import asyncio
-import tempfile
 from unittest import mock
-import sqlite3
-import time
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import OperationalError
 
 from app.database.init_db import init_db, verify_password, check_admin_default_password
-from app.models.user import Base, User
+from app.models.user import User
 
-# Wyłączenie testu z timeout, który trwa zbyt długo
-@pytest.mark.skip(reason="Test takes too long to execute")
-@pytest.mark.asyncio
-async def test_init_db_timeout():
-    """Test init_db function with timeout simulation"""
-    # Mock the time.time function to simulate a timeout
-    with mock.patch('app.database.init_db.time.time', side_effect=[0, 20]):
-        # Mock the logger to avoid actual logging during tests
-        with mock.patch('app.database.init_db.logger'):
-            # Call init_db with a shorter timeout
-            await init_db(timeout=1)
-            # Test passes if no exception is raised (the function handles timeout internally)
-
-@pytest.mark.asyncio
-async def test_init_db_success():
+async def test_init_db_success(mock_init_db_attrs):
     """Test successful database initialization"""
-    # Create temp file for test DB
-    with tempfile.NamedTemporaryFile(suffix='.db') as tmp:
-        test_db_url = f"sqlite:///{tmp.name}"
-        
-        # Mock the database engine and migrations
-        with mock.patch('app.database.init_db.engine'), \
-             mock.patch('app.database.init_db.asyncio.to_thread') as mock_to_thread, \
-             mock.patch('app.database.init_db.Session') as mock_session, \
-             mock.patch('app.database.init_db.logger'):
-            
-            # Mock the session return value
-            mock_db = mock.MagicMock()
-            mock_session.return_value = mock_db
-            
-            # Mock query to simulate no existing admin
-            mock_query = mock.MagicMock()
-            mock_db.query.return_value.filter.return_value.first.return_value = None
-            
-            # Call init_db
-            await init_db(timeout=5)
-            
-            # Verify migrations were attempted
-            mock_to_thread.assert_called()
-            
-            # Verify admin user was queried
-            mock_db.query.assert_called()
-            
-            # Verify admin user was added
-            mock_db.add.assert_called()
-            mock_db.commit.assert_called()
-            mock_db.close.assert_called()
+    # Mock the database engine and migrations
+    _, mock_run_migrations, mock_session, _, _ = mock_init_db_attrs(
+        "engine", "run_migrations", "Session", "check_admin_default_password", "logger"
+    )
+    mock_db = mock.MagicMock()
+    mock_session.return_value = mock_db
+    
+    # Mock query to simulate no existing admin
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+    
+    # Call init_db
+    await init_db(timeout=5)
+    
+    # Verify migrations were attempted
+    mock_run_migrations.assert_called()
+    
+    # Verify admin user was queried
+    mock_db.query.assert_called()
+    
+    # Verify admin user was added
+    mock_db.add.assert_called()
+    mock_db.commit.assert_called()
+    mock_db.close.assert_called()
 
-@pytest.mark.asyncio
-async def test_init_db_with_existing_admin():
+async def test_init_db_with_existing_admin(mock_init_db_attrs):
     """Test init_db when admin user already exists"""
     # Mock the session and database access
-    with mock.patch('app.database.init_db.asyncio.to_thread') as mock_to_thread, \
-         mock.patch('app.database.init_db.Session') as mock_session, \
-         mock.patch('app.database.init_db.logger'):
-        
-        # Mock the session return value
-        mock_db = mock.MagicMock()
-        mock_session.return_value = mock_db
-        
-        # Mock query to simulate existing admin
-        mock_admin = mock.MagicMock(spec=User)
-        mock_admin.username = "admin"
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_admin
-        
-        # Call init_db
-        await init_db(timeout=5)
-        
-        # Verify admin user was not added
-        mock_db.add.assert_not_called()
-        
-        # Verify session was closed
-        mock_db.close.assert_called()
+    _, mock_session, _, _ = mock_init_db_attrs(
+        "run_migrations", "Session", "check_admin_default_password", "logger"
+    )
+    mock_db = mock.MagicMock()
+    mock_session.return_value = mock_db
+    
+    # Mock query to simulate existing admin
+    mock_admin = mock.MagicMock(spec=User)
+    mock_admin.username = "admin"
+    mock_db.query.return_value.filter.return_value.first.return_value = mock_admin
+    
+    # Call init_db
+    await init_db(timeout=5)
+    
+    # Verify admin user was not added
+    mock_db.add.assert_not_called()
+    
+    # Verify session was closed
+    mock_db.close.assert_called()
 
-@pytest.mark.asyncio
-async def test_init_db_migration_error():
+async def test_init_db_migration_error(mock_init_db_attrs):
     """Test init_db when migrations fail"""
     # Mock the database and migrations to simulate a migration error
-    with mock.patch('app.database.init_db.asyncio.to_thread') as mock_to_thread, \
-         mock.patch('app.database.init_db.Session') as mock_session, \
-         mock.patch('app.database.init_db.logger') as mock_logger:
-        
-        # Make the to_thread call raise an exception for migrations
-        mock_to_thread.side_effect = [Exception("Migration error"), None]
-        
-        # Mock the session
-        mock_db = mock.MagicMock()
-        mock_session.return_value = mock_db
-        
-        # Mock query to simulate no existing admin
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        # Call init_db
-        await init_db(timeout=5)
-        
-        # Verify error was logged
-        mock_logger.error.assert_called()
-        
-        # Verify admin user creation was still attempted
-        mock_db.query.assert_called()
-        mock_db.add.assert_called()
-        mock_db.commit.assert_called()
-        mock_db.close.assert_called()
+    mock_run_migrations, mock_session, _, mock_logger = mock_init_db_attrs(
+        "run_migrations", "Session", "check_admin_default_password", "logger"
+    )
+    mock_db = mock.MagicMock()
+    mock_session.return_value = mock_db
+    
+    # Make the migration run raise an exception
+    mock_run_migrations.side_effect = Exception("Migration error")
+    
+    # Mock query to simulate no existing admin
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+    
+    # Call init_db
+    await init_db(timeout=5)
+    
+    # Verify error was logged
+    mock_logger.error.assert_called()
+    
+    # Verify admin user creation was still attempted
+    mock_db.query.assert_called()
+    mock_db.add.assert_called()
+    mock_db.commit.assert_called()
+    mock_db.close.assert_called()
 
-@pytest.mark.asyncio
-async def test_init_db_admin_creation_error():
+async def test_init_db_admin_creation_error(mock_init_db_attrs):
     """Test init_db when admin user creation fails"""
     # Mock the database and session to simulate error during admin creation
-    with mock.patch('app.database.init_db.asyncio.to_thread'), \
-         mock.patch('app.database.init_db.Session') as mock_session, \
-         mock.patch('app.database.init_db.logger') as mock_logger:
-        
-        # Mock the session return value
-        mock_db = mock.MagicMock()
-        mock_session.return_value = mock_db
-        
-        # Mock query to simulate no existing admin
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        
-        # Make commit raise an exception
-        mock_db.commit.side_effect = Exception("Database error")
-        
-        # Call init_db
-        await init_db(timeout=5)
-        
-        # Verify error was logged
-        mock_logger.error.assert_called()
-        
-        # Verify rollback was called
-        mock_db.rollback.assert_called()
-        
-        # Verify session was closed
-        mock_db.close.assert_called()
+    _, mock_session, _, mock_logger = mock_init_db_attrs(
+        "run_migrations", "Session", "check_admin_default_password", "logger"
+    )
+    mock_db = mock.MagicMock()
+    mock_session.return_value = mock_db
+    
+    # Mock query to simulate no existing admin
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+    
+    # Make commit raise an exception
+    mock_db.commit.side_effect = Exception("Database error")
+    
+    # Call init_db
+    await init_db(timeout=5)
+    
+    # Verify error was logged
+    mock_logger.error.assert_called()
+    
+    # Verify rollback was called
+    mock_db.rollback.assert_called()
+    
+    # Verify session was closed
+    mock_db.close.assert_called()
 
-def test_verify_password():
+def test_verify_password(known_password_hash):
     """Test password verification function"""
-    # Import bezpośrednio kontekst hasłowania
-    from app.database.init_db import pwd_context
-    
-    # Utworzenie hasła wzorcowego
-    test_password = "testpassword123"
-    hashed_password = pwd_context.hash(test_password)
+    password, password_hash = known_password_hash
     
     # Test poprawnego hasła
-    assert verify_password(test_password, hashed_password) is True
+    assert verify_password(password, password_hash) is True
     
     # Test niepoprawnego hasła
-    assert verify_password("wrongpassword", hashed_password) is False
+    assert verify_password("wrongpassword", password_hash) is False
 
 def test_check_admin_default_password():
     """Test admin default password check"""
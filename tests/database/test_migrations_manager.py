@@ -6,6 +6,7 @@ import os
 import pytest
 import logging
 import tempfile
+from functools import lru_cache
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 from alembic.config import Config
@@ -15,6 +16,21 @@ from app.database.migrations_manager import (
     run_migrations
 )
 
+
+@lru_cache(maxsize=None)
+def _cached_alembic_config(data_directory):
+    """Build the alembic Config once per data directory for this module"""
+    return get_alembic_config()
+
+
+@pytest.fixture(autouse=True)
+def _reuse_alembic_config(monkeypatch):
+    """Let run_migrations reuse a parsed alembic.ini instead of reading it per test"""
+    monkeypatch.setattr(
+        "app.database.migrations_manager.get_alembic_config",
+        lambda: _cached_alembic_config(os.environ.get("DATA_DIRECTORY", "./data"))
+    )
+
 def test_get_alembic_config():
     """Test that get_alembic_config returns a valid Alembic Config object"""
     # Get the config
@@ -29,6 +45,18 @@ def test_get_alembic_config():
     assert os.path.basename(config_path) == "alembic.ini"
 
 
+def test_get_alembic_config_follows_data_directory():
+    """Test that each call builds a fresh Config pointing at DATA_DIRECTORY"""
+    assert get_alembic_config() is not get_alembic_config()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with patch.dict(os.environ, {"DATA_DIRECTORY": temp_dir}):
+            config = get_alembic_config()
+    
+    db_path = os.path.join(temp_dir, "todoist.db")
+    assert config.get_main_option("sqlalchemy.url") == f"sqlite:///{db_path}"
+
+
 @patch('app.database.migrations_manager.command')
 def test_run_migrations_success(mock_command):
     """Test that run_migrations calls the command.upgrade function with correct parameters"""
@@ -1,16 +1,28 @@
 """
 Configuration and fixtures for E2E tests.
+
+The suite is safe to run under pytest-xdist (``-n auto --dist=loadgroup``).
+Session-scoped fixtures run once per worker, and every user they create gets
+a uuid4-based name, so workers never collide. State that must exist exactly
+once per run has to be guarded by a FileLock, as ensure_api_running and
+auth_test_user do.
+Tests that would race on shared server data share an ``xdist_group``.
 """
 
 import os
+import json
+import functools
 import pytest
-import requests
+import httpx
+from jose import JWTError, jwt
 import time
 import subprocess
 import logging
 import random
-import string
-from typing import Generator, Optional, Dict, Tuple
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Generator, Optional, Dict, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +30,20 @@ logger = logging.getLogger(__name__)
 DEFAULT_BASE_URL = "http://localhost:5000"
 MAX_RETRY_ATTEMPTS = 5
 RETRY_WAIT_SECONDS = 2
+# Startup probe: poll after 50ms, doubling up to 2s with +/-25% jitter, for at
+# most 30s in total
+PROBE_INITIAL_DELAY_SECONDS = 0.05
+PROBE_MAX_DELAY_SECONDS = 2.0
+PROBE_JITTER = 0.25
+PROBE_DEADLINE_SECONDS = 30
+PROBE_TIMEOUT_SECONDS = 2
+# Connection pool shared by all e2e requests (and xdist-style concurrent use)
+HTTP_POOL_SIZE = 32
+HTTP_TIMEOUT_SECONDS = 10.0
+# Upper bound on users registered up front for destructive tests
+USER_POOL_MAX_SIZE = 8
+# Noisy shell variables left out of the diagnostic environment dump
+ENV_DUMP_SKIP_PREFIXES = ('PATH', 'PS', 'LESS', 'LC_', 'BASH')
 
 
 def pytest_addoption(parser):
@@ -30,27 +56,48 @@ def pytest_addoption(parser):
     )
 
 
-def is_running_in_docker(request=None) -> bool:
+def pytest_configure(config):
+    """Resolve the e2e base URL once, before any fixture asks for it."""
+    config.addinivalue_line(
+        "markers", "needs_db: test depends on the database behind the API"
+    )
+    config._e2e_base_url = _resolve_base_url(config)
+
+
+def pytest_collection_finish(session):
+    """Remember what the selected tests need from the API."""
+    session.config._needs_db = any("needs_db" in item.keywords for item in session.items)
+    session.config._fresh_user_tests = sum(
+        "fresh_auth_user" in getattr(item, "fixturenames", ()) for item in session.items
+    )
+
+
+def is_running_in_docker(config=None) -> bool:
     """
     Check if the code is running inside a Docker container.
     
     Args:
-        request: pytest request object (optional)
+        config: pytest config object (optional)
         
     Returns:
         bool: True if running inside Docker, False otherwise
     """
     # If --skip-docker is passed, always return False
-    if request and request.config.getoption("--skip-docker", False):
+    if config and config.getoption("--skip-docker", False):
         logger.info("--skip-docker option used, skipping Docker container checks")
         return False
     
+    return _has_dockerenv()
+
+
+@functools.cache
+def _has_dockerenv() -> bool:
+    """Check for /.dockerenv once; the answer cannot change during a run."""
     # Several ways to check, we'll use the existence of /.dockerenv
     return os.path.exists("/.dockerenv")
 
 
-@pytest.fixture(scope="session")
-def base_url(request) -> str:
+def _resolve_base_url(config) -> str:
     """
     Determine the base URL for E2E tests.
     
@@ -58,13 +105,13 @@ def base_url(request) -> str:
     otherwise it will use a default URL.
     """
     # Use environment variable if provided
-    if os.environ.get("E2E_BASE_URL"):
-        base_url = os.environ.get("E2E_BASE_URL")
-        logger.info(f"Using environment-provided base URL: {base_url}")
-        return base_url
+    env_base_url = os.environ.get("E2E_BASE_URL")
+    if env_base_url:
+        logger.info(f"Using environment-provided base URL: {env_base_url}")
+        return env_base_url
     
     # If in Docker, use container name from environment or default
-    if is_running_in_docker(request):
+    if is_running_in_docker(config):
         container_name = os.environ.get("API_CONTAINER_NAME", "todoist_app")
         base_url = f"http://{container_name}:5000"
         logger.info(f"Using Docker container networking with URL: {base_url}")
@@ -76,134 +123,200 @@ def base_url(request) -> str:
 
 
 @pytest.fixture(scope="session")
-def api_session() -> Generator[requests.Session, None, None]:
+def base_url(request) -> str:
+    """Base URL for E2E tests, resolved once in pytest_configure."""
+    return request.config._e2e_base_url
+
+
+@pytest.fixture(scope="session")
+def urls(base_url) -> Dict[str, str]:
     """
-    Create a requests session for making API calls.
+    Endpoint URLs built once per session.
     
-    This session is reused across tests to maintain efficiency.
+    Plain concatenation keeps any path prefix in base_url, which urljoin
+    would silently drop for absolute paths.
+    """
+    return {
+        "register": f"{base_url}/api/auth/register",
+        "login": f"{base_url}/api/auth/login",
+        "me": f"{base_url}/api/users/me",
+        "gen_key": f"{base_url}/api/auth/apikey/generate",
+        "revoke_key": f"{base_url}/api/auth/apikey/revoke/{{id}}",
+        "projects": f"{base_url}/api/projects",
+        "users": f"{base_url}/api/users",
+        "health": f"{base_url}/health",
+    }
+
+
+@pytest.fixture(scope="session")
+def api_session() -> Generator[httpx.Client, None, None]:
     """
-    session = requests.Session()
-    session.headers.update({
-        "User-Agent": "E2ETest/1.0",
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    })
+    Create an HTTP client for making API calls.
     
-    yield session
+    This client is reused across tests to maintain efficiency.
+    """
+    # Larger keep-alive pool, plus a few quick retries for dropped connections.
+    # uvicorn only speaks HTTP/1.1, so there is nothing to gain from http2.
+    transport = httpx.HTTPTransport(
+        retries=3,
+        limits=httpx.Limits(
+            max_connections=HTTP_POOL_SIZE,
+            max_keepalive_connections=HTTP_POOL_SIZE,
+        ),
+    )
     
-    # Clean up
-    session.close()
+    with httpx.Client(
+        transport=transport,
+        timeout=HTTP_TIMEOUT_SECONDS,
+        follow_redirects=True,
+        headers={
+            "User-Agent": "E2ETest/1.0",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        },
+    ) as client:
+        yield client
 
 
-@pytest.fixture(scope="session", autouse=True)
-def ensure_api_running(base_url) -> None:
+@pytest.fixture(scope="session")
+def assert_status(api_session) -> Callable[..., int]:
     """
-    Ensure the API is running and accessible before running tests.
+    Check only the status code of a request, without reading the body.
+    
+    The response is streamed and closed unread, so error bodies are neither
+    downloaded nor parsed. Use it only where the test ignores the body.
+    
+    Returns:
+        Function taking method, url, expected status, an assertion message,
+        and any httpx request keyword arguments
     """
-    logger.info(f"Checking API availability at {base_url}")
+    def check(method: str, url: str, expected: int, message: str, **kwargs) -> int:
+        with api_session.stream(method, url, **kwargs) as response:
+            assert response.status_code == expected, f"{message}, got {response.status_code}"
+            return response.status_code
     
-    # Try to connect to API with increased timeout and retries
-    for attempt in range(10):
-        try:
-            logger.info(f"API connection attempt {attempt+1}/10")
-            # First try a simple root endpoint that doesn't require DB
-            response = requests.get(f"{base_url}/", timeout=10)
-            if response.status_code == 200:
-                logger.info(f"Basic API endpoint is accessible: {response.json()}")
-                
-                # Then try the health endpoint, but don't fail if it's not ready
-                try:
-                    health_response = requests.get(f"{base_url}/health", timeout=10)
-                    if health_response.status_code == 200:
-                        logger.info(f"API health check succeeded: {health_response.json()}")
-                    else:
-                        logger.warning(f"API health check failed with status {health_response.status_code}")
-                        logger.warning("Some database-dependent tests may fail")
-                except requests.RequestException as e:
-                    logger.warning(f"Health endpoint not accessible: {str(e)}")
-                    logger.warning("Some database-dependent tests may fail")
-                
-                # Continue with tests even if health endpoint isn't ready yet
-                return
-            else:
-                logger.warning(f"Basic API endpoint check failed: {response.status_code}")
-        except requests.RequestException as e:
-            logger.warning(f"Connection error on attempt {attempt+1}/10: {str(e)}")
+    return check
+
+
+def _probe_api(base_url, api_session, check_health: bool = True) -> bool:
+    """
+    Wait for the API root endpoint to answer.
+    
+    Args:
+        base_url: API base URL
+        api_session: Client used for the follow-up health check
+        check_health: Also wait for the database-backed /health endpoint
         
-        time.sleep(3)
+    Returns:
+        bool: True if the API answered, False if it never came up
+    """
+    logger.info(f"Checking API availability at {base_url}")
     
-    logger.error(f"Could not connect to API at {base_url} after 10 attempts")
-    logger.error("Available environment variables:")
-    for key, value in sorted(os.environ.items()):
-        if not key.startswith(('PATH', 'PS', 'LESS', 'LC_', 'BASH')):
-            logger.error(f"  {key}={value}")
+    delay = PROBE_INITIAL_DELAY_SECONDS
+    deadline = time.monotonic() + PROBE_DEADLINE_SECONDS
+    attempts = 0
     
-    pytest.skip(f"API server not accessible at {base_url}")
+    # Dedicated probe client so the polling never touches api_session's pool
+    with httpx.Client(timeout=PROBE_TIMEOUT_SECONDS) as probe:
+        while True:
+            attempts += 1
+            try:
+                # First try a simple root endpoint that doesn't require DB.
+                # FastAPI GET routes do not answer HEAD, so the probe uses GET.
+                response = probe.get(f"{base_url}/")
+                if response.status_code == 200:
+                    logger.info(f"Basic API endpoint is accessible: {response.json()}")
+                    
+                    # Then wait for the database, but don't fail if it's not ready
+                    if check_health:
+                        _wait_for_database(base_url, api_session, deadline)
+                    
+                    # Continue with tests even if health endpoint isn't ready yet
+                    return True
+                logger.debug(f"Basic API endpoint check failed: {response.status_code}")
+            except httpx.HTTPError as e:
+                logger.debug(f"Connection error on attempt {attempts}: {str(e)}")
+            
+            if time.monotonic() + delay > deadline:
+                break
+            time.sleep(delay * random.uniform(1 - PROBE_JITTER, 1 + PROBE_JITTER))
+            delay = min(delay * 2, PROBE_MAX_DELAY_SECONDS)
+    
+    logger.error(f"Could not connect to API at {base_url} after {attempts} attempts")
+    return False
 
 
-@pytest.fixture(scope="function")
-def api_test_user(api_session, base_url) -> Optional[dict]:
+def _wait_for_database(base_url, api_session, deadline: float) -> bool:
     """
-    Create a test user for API testing.
+    Poll /health until it reports a connected database or the deadline passes.
     
-    Creates a user with unique credentials for tests that require authentication.
+    Runs once per session, so individual tests never wait for the database.
+    The polls go through api_session, which also warms its connection pool.
+    
+    Returns:
+        bool: True if the database reported connected before the deadline
     """
-    # Use both timestamp and random string to ensure uniqueness
-    timestamp = int(time.time())
-    random_str = ''.join(random.choices(string.ascii_lowercase, k=8))
-    username = f"testuser_{timestamp}_{random_str}"
-    email = f"test_{timestamp}_{random_str}@example.com"
-    password = "TestPassword123"
+    delay = PROBE_INITIAL_DELAY_SECONDS
     
-    try:
-        # Register the user
-        register_response = api_session.post(
-            f"{base_url}/api/auth/register",
-            json={
-                "username": username,
-                "email": email,
-                "password": password
-            }
-        )
+    while True:
+        try:
+            response = api_session.get(f"{base_url}/health", timeout=PROBE_TIMEOUT_SECONDS)
+            if response.status_code == 200 and response.json().get("database") == "connected":
+                logger.info(f"API health check succeeded: {response.json()}")
+                return True
+            logger.debug(f"API health check not ready: {response.status_code}")
+        except httpx.HTTPError as e:
+            logger.debug(f"Health endpoint not accessible: {str(e)}")
         
-        # Check if registration was successful
-        if register_response.status_code != 201:
-            logger.warning(f"Failed to create test user: {register_response.text}")
-            return None
-            
-        # Log in to get authentication token
-        login_response = api_session.post(
-            f"{base_url}/api/auth/login",
-            json={
-                "email": email,
-                "password": password
-            }
+        if time.monotonic() + delay > deadline:
+            break
+        time.sleep(delay * random.uniform(1 - PROBE_JITTER, 1 + PROBE_JITTER))
+        delay = min(delay * 2, PROBE_MAX_DELAY_SECONDS)
+    
+    logger.warning("Database did not report connected before the startup deadline")
+    logger.warning("Some database-dependent tests may fail")
+    return False
+
+
+def _log_diagnostic_env() -> None:
+    """Log the environment to help debug an unreachable API."""
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error(
+            "Available environment variables: %s",
+            {key: value for key, value in os.environ.items() if not key.startswith(ENV_DUMP_SKIP_PREFIXES)}
         )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def ensure_api_running(request, base_url, api_session, tmp_path_factory) -> None:
+    """
+    Ensure the API is running and accessible before running tests.
+    
+    The database-backed /health endpoint is only checked when a selected
+    test is marked needs_db. Under pytest-xdist only the first worker probes
+    the API; the others wait on a shared lock and reuse its result from a
+    flag file.
+    """
+    check_health = getattr(request.config, "_needs_db", True)
+    
+    if os.environ.get("PYTEST_XDIST_WORKER") is None:
+        api_ready = _probe_api(base_url, api_session, check_health)
+    else:
+        from filelock import FileLock
         
-        # Check if login was successful
-        if login_response.status_code != 200:
-            logger.warning(f"Failed to log in with test user: {login_response.text}")
-            return None
-            
-        login_data = login_response.json()
-        token = login_data.get("access_token")
-        
-        if not token:
-            logger.warning("Login response did not contain access token")
-            return None
-            
-        # Return user details including token
-        return {
-            "id": register_response.json().get("id"),
-            "username": username,
-            "email": email,
-            "password": password,
-            "token": token
-        }
-            
-    except Exception as e:
-        logger.exception(f"Error creating test user: {str(e)}")
-        return None
+        # basetemp is per worker; its parent is shared by the whole run
+        shared_dir = tmp_path_factory.getbasetemp().parent
+        flag_file = shared_dir / "api_ready.flag"
+        with FileLock(str(shared_dir / "api_ready.lock")):
+            if flag_file.is_file():
+                api_ready = flag_file.read_text() == "ready"
+            else:
+                api_ready = _probe_api(base_url, api_session, check_health)
+                flag_file.write_text("ready" if api_ready else "unavailable")
+    
+    if not api_ready:
+        _log_diagnostic_env()
+        pytest.skip(f"API server not accessible at {base_url}")
 
 
 def create_unique_user_data() -> Tuple[str, str, str]:
@@ -213,47 +326,61 @@ def create_unique_user_data() -> Tuple[str, str, str]:
     Returns:
         Tuple containing username, email, and password
     """
-    # Use both timestamp and random string to ensure uniqueness
-    timestamp = int(time.time())
-    random_str = ''.join(random.choices(string.ascii_lowercase, k=8))
-    username = f"testuser_{timestamp}_{random_str}"
-    email = f"test_{timestamp}_{random_str}@example.com"
-    password = "TestPassword123"
-    return username, email, password
+    # A random UUID tag stays unique across tests and parallel workers alike
+    tag = uuid.uuid4().hex[:12]
+    return f"testuser_{tag}", f"test_{tag}@example.com", "TestPassword123"
 
 
-def create_test_user(api_session, base_url) -> Tuple[str, str, str]:
+@pytest.fixture(scope="session")
+def unique_user_data() -> Callable[[], Tuple[str, str, str]]:
     """
-    Helper function to create a test user for login and authentication tests.
+    Hand test modules the one scheme for fresh user credentials.
     
     Returns:
-        Tuple containing username, email, and password of the created user
+        create_unique_user_data, returning (username, email, password)
     """
-    # Generate unique credentials
-    username, email, password = create_unique_user_data()
-    
-    # Try to register
-    response = api_session.post(
-        f"{base_url}/api/auth/register",
-        json={
-            "username": username,
-            "email": email,
-            "password": password
-        }
-    )
+    return create_unique_user_data
+
+
+def register_test_user(api_session, base_url) -> Dict[str, Any]:
+    """
+    Register a test user and keep the id from the registration response.
     
-    # If registration succeeds, return credentials
-    if response.status_code == 201:
-        return username, email, password
+    Args:
+        api_session: Client for API calls
+        base_url: API base URL
     
-    # If email already registered, try again with new credentials
-    if response.status_code == 400 and "already registered" in response.text:
+    Returns:
+        Dict with id, username, email, and password
+    """
+    for _ in range(MAX_RETRY_ATTEMPTS):
+        # Generate unique credentials
+        username, email, password = create_unique_user_data()
+        user = {"id": None, "username": username, "email": email, "password": password}
+        
+        # Try to register
+        response = api_session.post(
+            f"{base_url}/api/auth/register",
+            json={
+                "username": username,
+                "email": email,
+                "password": password
+            }
+        )
+        
+        # If registration succeeds, the response already carries the new user's id
+        if response.status_code == 201:
+            user["id"] = response.json().get("id")
+            return user
+        
+        # Anything other than a duplicate user is a real failure
+        assert response.status_code == 400 and "already registered" in response.text, \
+            f"Failed to create test user: {response.text}"
+        
+        # If email already registered, try again with new credentials
         logger.warning("Email or username already registered, trying again with new credentials")
-        return create_test_user(api_session, base_url)
     
-    # If some other error occurred, fail the test
-    assert response.status_code == 201, f"Failed to create test user: {response.text}"
-    return username, email, password
+    raise AssertionError(f"Failed to register a unique test user after {MAX_RETRY_ATTEMPTS} attempts")
 
 
 def get_auth_token(api_session, base_url, email: str, password: str) -> str:
@@ -261,7 +388,7 @@ def get_auth_token(api_session, base_url, email: str, password: str) -> str:
     Helper function to get an authentication token.
     
     Args:
-        api_session: Session for API calls
+        api_session: Client for API calls
         base_url: API base URL
         email: User email
         password: User password
@@ -283,33 +410,135 @@ def get_auth_token(api_session, base_url, email: str, password: str) -> str:
     return data["access_token"]
 
 
-@pytest.fixture(scope="function")
-def auth_test_user(api_session, base_url) -> Dict[str, str]:
+def _token_user_id(token: str) -> Optional[int]:
     """
-    Create a test user with valid credentials and token for authentication tests.
+    Read the user id from a JWT's sub claim.
+    
+    The signature is not checked; this only saves test helpers a round-trip
+    to /api/users/me and must never be used to trust a token.
     
     Returns:
-        Dict with username, email, password, and token
+        User id, or None if the token cannot be decoded
     """
-    username, email, password = create_test_user(api_session, base_url)
-    token = get_auth_token(api_session, base_url, email, password)
+    try:
+        return int(jwt.get_unverified_claims(token)["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _register_auth_user(api_session, base_url) -> Dict[str, str]:
+    """
+    Register a user and log in, reusing the id from the registration response.
     
-    # Get user ID by accessing the /api/users/me endpoint with the token
-    user_response = api_session.get(
-        f"{base_url}/api/users/me",
-        headers={"Authorization": f"Bearer {token}"}
-    )
+    Returns:
+        Dict with id, username, email, password, and token
+    """
+    user = register_test_user(api_session, base_url)
+    token = get_auth_token(api_session, base_url, user["email"], user["password"])
+    user_id = user["id"]
     
-    if user_response.status_code != 200:
-        logger.warning(f"Failed to get user details: {user_response.text}")
-        user_id = None
-    else:
-        user_id = user_response.json().get("id")
+    # Without an id in the registration response, read it from the token
+    if user_id is None:
+        user_id = _token_user_id(token)
+    
+    # Only ask the API when the token could not be decoded either
+    if user_id is None:
+        user_response = api_session.get(
+            f"{base_url}/api/users/me",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        if user_response.status_code != 200:
+            logger.warning(f"Failed to get user details: {user_response.text}")
+        else:
+            user_id = user_response.json().get("id")
     
     return {
         "id": user_id,
-        "username": username,
-        "email": email,
-        "password": password,
+        "username": user["username"],
+        "email": user["email"],
+        "password": user["password"],
         "token": token
     }
+
+
+@pytest.fixture(scope="session")
+def auth_test_user(api_session, base_url, tmp_path_factory) -> Dict[str, str]:
+    """
+    Test user with valid credentials and token, shared by the whole session.
+    
+    Every test that requests this fixture sees the same user. Use it only
+    for tests that add data of their own; tests that modify or revoke the
+    user's credentials must use fresh_auth_user. Under pytest-xdist the
+    first worker registers the user and the others read it from a shared
+    file, so the run logs in once rather than once per worker.
+    
+    Returns:
+        Dict with id, username, email, password, and token
+    """
+    if os.environ.get("PYTEST_XDIST_WORKER") is None:
+        return _register_auth_user(api_session, base_url)
+    
+    from filelock import FileLock
+    
+    # basetemp is per worker; its parent is shared by the whole run
+    shared_dir = tmp_path_factory.getbasetemp().parent
+    user_file = shared_dir / "auth_test_user.json"
+    with FileLock(str(shared_dir / "auth_test_user.lock")):
+        if user_file.is_file():
+            return json.loads(user_file.read_text())
+        user = _register_auth_user(api_session, base_url)
+        user_file.write_text(json.dumps(user))
+        return user
+
+
+@pytest.fixture(scope="session")
+def user_pool(request, api_session, base_url) -> Deque[Dict[str, str]]:
+    """
+    Users for destructive tests, registered in parallel on first use.
+    
+    The pool holds one user per selected test that requests fresh_auth_user,
+    up to USER_POOL_MAX_SIZE; fresh_auth_user registers more on demand.
+    Under pytest-xdist every worker sees the whole collection but runs only
+    part of it, so the pool starts empty and each test registers its own.
+    """
+    if os.environ.get("PYTEST_XDIST_WORKER") is not None:
+        return deque()
+    
+    size = min(max(getattr(request.config, "_fresh_user_tests", 1), 1), USER_POOL_MAX_SIZE)
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        users = executor.map(lambda _: _register_auth_user(api_session, base_url), range(size))
+        return deque(users)
+
+
+@pytest.fixture(scope="function")
+def fresh_auth_user(user_pool, api_session, base_url) -> Dict[str, str]:
+    """
+    Hand a separate test user to a single destructive test.
+    
+    Returns:
+        Dict with id, username, email, password, and token
+    """
+    if user_pool:
+        return user_pool.popleft()
+    return _register_auth_user(api_session, base_url)
+
+
+@pytest.fixture(scope="session")
+def shared_api_key(api_session, urls, auth_test_user) -> Dict[str, Any]:
+    """
+    API key generated once for the session user, for read-only key tests.
+    
+    Tests that revoke or otherwise change a key must generate their own.
+    
+    Returns:
+        Dict with the API key data returned by the generate endpoint
+    """
+    response = api_session.post(
+        urls["gen_key"],
+        headers={"Authorization": f"Bearer {auth_test_user['token']}"},
+        json={"description": "E2E Test API Key"}
+    )
+    
+    assert response.status_code == 201, f"Failed to generate API key: {response.text}"
+    return response.json()
@@ -4,28 +4,16 @@ E2E tests for API key authentication.
 
 import logging
 import time
-from urllib.parse import urljoin
 import uuid
 
 import pytest
-import requests
 
 logger = logging.getLogger(__name__)
 
-def test_api_key_generation(base_url, api_session, auth_test_user):
+@pytest.mark.needs_db
+def test_api_key_generation(urls, api_session, shared_api_key):
     """Test generating an API key and using it for authentication."""
-    # Login and get JWT token
-    token = auth_test_user["token"]
-    
-    # Generate API key
-    response = api_session.post(
-        urljoin(base_url, "/api/auth/apikey/generate"),
-        headers={"Authorization": f"Bearer {token}"},
-        json={"description": "E2E Test API Key"}
-    )
-    
-    assert response.status_code == 201, f"Failed to generate API key: {response.text}"
-    api_key_data = response.json()
+    api_key_data = shared_api_key
     assert "key_value" in api_key_data
     assert "description" in api_key_data
     assert api_key_data["description"] == "E2E Test API Key"
@@ -34,7 +22,7 @@ def test_api_key_generation(base_url, api_session, auth_test_user):
     
     # Use API key to access protected endpoint
     response = api_session.get(
-        urljoin(base_url, "/api/users/me"),
+        urls["me"],
         headers={"x-api-key": api_key}
     )
     
@@ -45,40 +33,37 @@ def test_api_key_generation(base_url, api_session, auth_test_user):
     assert "email" in user_data
 
 
-def test_invalid_api_key(base_url, api_session):
-    """Test that invalid API keys are rejected."""
-    response = api_session.get(
-        urljoin(base_url, "/api/users/me"),
-        headers={"x-api-key": "invalid_api_key_value"}
-    )
-    
-    assert response.status_code == 401, f"Expected 401 status code, got {response.status_code}"
-
-
-def test_missing_api_key(base_url, api_session):
-    """Test that missing API key results in authentication failure."""
-    response = api_session.get(urljoin(base_url, "/api/users/me"))
+@pytest.mark.needs_db
+@pytest.mark.parametrize(
+    "headers",
+    [{"x-api-key": "invalid_api_key_value"}, {}],
+    ids=["invalid", "missing"]
+)
+def test_api_key_rejected(urls, api_session, headers):
+    """Test that invalid or missing API keys are rejected."""
+    response = api_session.get(urls["me"], headers=headers)
     assert response.status_code == 401, f"Expected 401 status code, got {response.status_code}"
 
 
-def test_api_key_generation_without_auth(base_url, api_session):
+def test_api_key_generation_without_auth(urls, api_session):
     """Test that generating an API key requires authentication."""
     response = api_session.post(
-        urljoin(base_url, "/api/auth/apikey/generate"),
+        urls["gen_key"],
         json={"description": "Unauthorized attempt"}
     )
     
     assert response.status_code == 401, f"Expected 401 status code, got {response.status_code}"
 
 
-def test_api_key_generation_and_revocation(base_url, api_session, auth_test_user):
+@pytest.mark.needs_db
+def test_api_key_generation_and_revocation(urls, api_session, fresh_auth_user):
     """Test full API key lifecycle: generation, use, revocation, and rejected use after revocation."""
     # Login and get JWT token
-    token = auth_test_user["token"]
+    token = fresh_auth_user["token"]
     
     # Generate API key
     response = api_session.post(
-        urljoin(base_url, "/api/auth/apikey/generate"),
+        urls["gen_key"],
         headers={"Authorization": f"Bearer {token}"},
         json={"description": "Revocation Test Key"}
     )
@@ -90,7 +75,7 @@ def test_api_key_generation_and_revocation(base_url, api_session, auth_test_user
     
     # Verify API key works
     response = api_session.get(
-        urljoin(base_url, "/api/users/me"),
+        urls["me"],
         headers={"x-api-key": api_key}
     )
     
@@ -98,14 +83,14 @@ def test_api_key_generation_and_revocation(base_url, api_session, auth_test_user
     
     # Revoke the API key
     response = api_session.post(
-        urljoin(base_url, f"/api/auth/apikey/revoke/{api_key_id}"),
+        urls["revoke_key"].format(id=api_key_id),
         headers={"Authorization": f"Bearer {token}"}
     )
     assert response.status_code == 200, f"Failed to revoke API key: {response.text}"
     
     # Verify API key no longer works
     response = api_session.get(
-        urljoin(base_url, "/api/users/me"),
+        urls["me"],
         headers={"x-api-key": api_key}
     )
     assert response.status_code == 401, f"Expected 401 for revoked API key, got {response.status_code}"
@@ -2,92 +2,12 @@
 E2E tests for authentication flows.
 """
 import logging
-import time
-import random
-import string
-from typing import Dict, Optional, Tuple
 
 import pytest
-import requests
 
 logger = logging.getLogger(__name__)
 
-
-def create_unique_user_data() -> Tuple[str, str, str]:
-    """
-    Generate unique user data for tests to avoid conflicts.
-    
-    Returns:
-        Tuple containing username, email, and password
-    """
-    # Use both timestamp and random string to ensure uniqueness
-    timestamp = int(time.time())
-    random_str = ''.join(random.choices(string.ascii_lowercase, k=8))
-    username = f"testuser_{timestamp}_{random_str}"
-    email = f"test_{timestamp}_{random_str}@example.com"
-    password = "TestPassword123"
-    return username, email, password
-
-
-def create_test_user(api_session, base_url) -> Tuple[str, str, str]:
-    """
-    Helper function to create a test user for login and authentication tests.
-    
-    Returns:
-        Tuple containing username, email, and password of the created user
-    """
-    # Generate unique credentials
-    username, email, password = create_unique_user_data()
-    
-    # Try to register
-    response = api_session.post(
-        f"{base_url}/api/auth/register",
-        json={
-            "username": username,
-            "email": email,
-            "password": password
-        }
-    )
-    
-    # If registration succeeds, return credentials
-    if response.status_code == 201:
-        return username, email, password
-    
-    # If email already registered, try again with new credentials
-    if response.status_code == 400 and "already registered" in response.text:
-        logger.warning("Email or username already registered, trying again with new credentials")
-        return create_test_user(api_session, base_url)
-    
-    # If some other error occurred, fail the test
-    assert response.status_code == 201, f"Failed to create test user: {response.text}"
-    return username, email, password
-
-
-def get_auth_token(api_session, base_url, email: str, password: str) -> str:
-    """
-    Helper function to get an authentication token.
-    
-    Args:
-        api_session: Session for API calls
-        base_url: API base URL
-        email: User email
-        password: User password
-        
-    Returns:
-        JWT token string
-    """
-    response = api_session.post(
-        f"{base_url}/api/auth/login",
-        json={
-            "email": email,
-            "password": password
-        }
-    )
-    
-    assert response.status_code == 200, f"Failed to get auth token: {response.text}"
-    data = response.json()
-    assert "access_token" in data, "Response does not contain access_token"
-    return data["access_token"]
+pytestmark = pytest.mark.needs_db
 
 
 def get_api_key(api_session, base_url, token: str) -> str:
@@ -95,7 +15,7 @@ def get_api_key(api_session, base_url, token: str) -> str:
     Helper function to generate an API key.
     
     Args:
-        api_session: Session for API calls
+        api_session: Client for API calls
         base_url: API base URL
         token: JWT token for authentication
         
@@ -114,7 +34,7 @@ def get_api_key(api_session, base_url, token: str) -> str:
     return data["key_value"]
 
 
-def test_register_user_success(api_session, base_url):
+def test_register_user_success(api_session, base_url, unique_user_data):
     """
     Test successful user registration.
     
@@ -124,7 +44,7 @@ def test_register_user_success(api_session, base_url):
     3. The user can subsequently log in with the created credentials
     """
     # Generate unique credentials for this test
-    username, email, password = create_unique_user_data()
+    username, email, password = unique_user_data()
     
     # Send registration request
     logger.info(f"Testing user registration with username: {username}")
@@ -165,7 +85,7 @@ def test_register_user_success(api_session, base_url):
     assert login_data["token_type"] == "bearer", f"Expected token_type 'bearer', got {login_data['token_type']}"
 
 
-def test_register_duplicate_email(api_session, base_url):
+def test_register_duplicate_email(api_session, base_url, unique_user_data):
     """
     Test registration fails when using an email that is already registered.
     
@@ -174,7 +94,7 @@ def test_register_duplicate_email(api_session, base_url):
     2. A second registration with the same email fails with a 400 status code
     """
     # Generate unique credentials for this test
-    username1, email, password = create_unique_user_data()
+    username1, email, password = unique_user_data()
     username2 = f"{username1}_duplicate"
     
     # First registration should succeed
@@ -205,7 +125,7 @@ def test_register_duplicate_email(api_session, base_url):
     assert "Email already registered" in error_data["detail"], f"Expected 'Email already registered' in error detail, got {error_data['detail']}"
 
 
-def test_register_duplicate_username(api_session, base_url):
+def test_register_duplicate_username(api_session, base_url, unique_user_data):
     """
     Test registration fails when using a username that is already taken.
     
@@ -213,12 +133,10 @@ def test_register_duplicate_username(api_session, base_url):
     1. The first registration succeeds
     2. A second registration with the same username fails with a 400 status code
     """
-    # Generate a unique username/email for the first registration
-    timestamp = int(time.time())
-    username = f"testuser_{timestamp}"
-    email1 = f"test_{timestamp}_1@example.com"
-    email2 = f"test_{timestamp}_2@example.com"
-    password = "TestPassword123"
+    # Generate a unique username/email for the first registration, and a
+    # second unique email for the attempt that reuses the username
+    username, email1, password = unique_user_data()
+    _, email2, _ = unique_user_data()
     
     # First registration should succeed
     response1 = api_session.post(
@@ -248,7 +166,17 @@ def test_register_duplicate_username(api_session, base_url):
     assert "Username already taken" in error_data["detail"], f"Expected 'Username already taken' in error detail, got {error_data['detail']}"
 
 
-def test_register_invalid_password(api_session, base_url):
+@pytest.mark.parametrize(
+    "password,case",
+    [
+        ("Short1", "short password"),
+        ("lowercase123", "no uppercase"),
+        ("UPPERCASE123", "no lowercase"),
+        ("NoDigitsHere", "no digits"),
+    ],
+    ids=["short", "no-upper", "no-lower", "no-digit"]
+)
+def test_register_invalid_password(api_session, base_url, unique_user_data, password, case):
     """
     Test registration fails with invalid passwords.
     
@@ -258,70 +186,28 @@ def test_register_invalid_password(api_session, base_url):
     3. Password without lowercase letters
     4. Password without digits
     """
-    timestamp = int(time.time())
-    username = f"testuser_{timestamp}"
-    email = f"test_{timestamp}@example.com"
-    
-    # Test password too short
-    short_password = "Short1"
-    response = api_session.post(
-        f"{base_url}/api/auth/register",
-        json={
-            "username": username,
-            "email": email,
-            "password": short_password
-        }
-    )
-    assert response.status_code == 422, f"Expected 422 for short password, got {response.status_code}"
-    
-    # Test password without uppercase
-    no_upper_password = "lowercase123"
-    response = api_session.post(
-        f"{base_url}/api/auth/register",
-        json={
-            "username": username,
-            "email": email,
-            "password": no_upper_password
-        }
-    )
-    assert response.status_code == 422, f"Expected 422 for no uppercase, got {response.status_code}"
-    
-    # Test password without lowercase
-    no_lower_password = "UPPERCASE123"
-    response = api_session.post(
-        f"{base_url}/api/auth/register",
-        json={
-            "username": username,
-            "email": email,
-            "password": no_lower_password
-        }
-    )
-    assert response.status_code == 422, f"Expected 422 for no lowercase, got {response.status_code}"
+    username, email, _ = unique_user_data()
     
-    # Test password without digits
-    no_digit_password = "NoDigitsHere"
     response = api_session.post(
         f"{base_url}/api/auth/register",
         json={
             "username": username,
             "email": email,
-            "password": no_digit_password
+            "password": password
         }
     )
-    assert response.status_code == 422, f"Expected 422 for no digits, got {response.status_code}"
+    assert response.status_code == 422, f"Expected 422 for {case}, got {response.status_code}"
 
 
-def test_register_invalid_email(api_session, base_url):
+def test_register_invalid_email(api_session, base_url, unique_user_data):
     """
     Test registration fails when using an invalid email format.
     
     This test verifies:
     1. Registration with an invalid email format fails with a 422 status code
     """
-    timestamp = int(time.time())
-    username = f"testuser_{timestamp}"
-    invalid_email = f"invalid_email_{timestamp}"  # Invalid email format
-    password = "TestPassword123"
+    username, _, password = unique_user_data()
+    invalid_email = f"invalid_email_{username}"  # Invalid email format
     
     response = api_session.post(
         f"{base_url}/api/auth/register",
@@ -337,7 +223,7 @@ def test_register_invalid_email(api_session, base_url):
     assert "detail" in error_data, "Error response should contain detail field"
 
 
-def test_login_success(api_session, base_url):
+def test_login_success(api_session, base_url, auth_test_user):
     """
     Test successful login and token generation.
     
@@ -346,8 +232,8 @@ def test_login_success(api_session, base_url):
     2. User can log in with correct credentials
     3. Login response contains a valid JWT token
     """
-    # Create a test user
-    username, email, password = create_test_user(api_session, base_url)
+    # Log in as the shared session user
+    email, password = auth_test_user["email"], auth_test_user["password"]
     
     # Attempt login
     response = api_session.post(
@@ -371,7 +257,8 @@ def test_login_success(api_session, base_url):
     assert len(token.split('.')) == 3, f"Token does not appear to be a valid JWT: {token}"
 
 
-def test_login_invalid_credentials(api_session, base_url):
+@pytest.mark.parametrize("wrong_field", ["password", "email"])
+def test_login_invalid_credentials(api_session, base_url, auth_test_user, unique_user_data, wrong_field):
     """
     Test login fails with invalid credentials.
     
@@ -379,32 +266,17 @@ def test_login_invalid_credentials(api_session, base_url):
     1. Login with incorrect password fails with 401 status code
     2. Login with non-existent email fails with 401 status code
     """
-    # Create a test user
-    username, email, password = create_test_user(api_session, base_url)
-    
-    # Test login with incorrect password
-    response = api_session.post(
-        f"{base_url}/api/auth/login",
-        json={
-            "email": email,
-            "password": "WrongPassword123"
-        }
-    )
+    # Use the shared session user; failed logins do not change it
+    credentials = {
+        "email": auth_test_user["email"],
+        "password": auth_test_user["password"]
+    }
+    if wrong_field == "password":
+        credentials["password"] = "WrongPassword123"
+    else:
+        _, credentials["email"], _ = unique_user_data()
     
-    assert response.status_code == 401, f"Expected 401 Unauthorized, got {response.status_code}: {response.text}"
-    error_data = response.json()
-    assert "detail" in error_data, "Error response should contain detail field"
-    assert "Incorrect email or password" in error_data["detail"], f"Expected 'Incorrect email or password' in error detail, got {error_data['detail']}"
-    
-    # Test login with non-existent email
-    non_existent_email = f"nonexistent_{int(time.time())}@example.com"
-    response = api_session.post(
-        f"{base_url}/api/auth/login",
-        json={
-            "email": non_existent_email,
-            "password": password
-        }
-    )
+    response = api_session.post(f"{base_url}/api/auth/login", json=credentials)
     
     assert response.status_code == 401, f"Expected 401 Unauthorized, got {response.status_code}: {response.text}"
     error_data = response.json()
@@ -413,7 +285,7 @@ def test_login_invalid_credentials(api_session, base_url):
     assert "Incorrect email or password" in error_data["detail"], f"Expected 'Incorrect email or password' in error detail, got {error_data['detail']}"
 
 
-def test_access_protected_endpoint_with_token(api_session, base_url):
+def test_access_protected_endpoint_with_token(api_session, base_url, auth_test_user):
     """
     Test accessing a protected endpoint using a valid JWT token.
     
@@ -421,9 +293,8 @@ def test_access_protected_endpoint_with_token(api_session, base_url):
     1. User can obtain a valid token through login
     2. Protected endpoints can be accessed with the token
     """
-    # Create a test user and get token
-    username, email, password = create_test_user(api_session, base_url)
-    token = get_auth_token(api_session, base_url, email, password)
+    # Use the shared session user and its token
+    username, token = auth_test_user["username"], auth_test_user["token"]
     
     # Try to access a protected endpoint
     response = api_session.get(
@@ -475,7 +346,7 @@ def test_access_protected_endpoint_with_invalid_token(api_session, base_url):
     assert "Could not validate" in error_data["detail"], f"Expected 'Could not validate' in error detail, got {error_data['detail']}"
 
 
-def test_api_key_authentication(api_session, base_url):
+def test_api_key_authentication(api_session, base_url, auth_test_user):
     """
     Test accessing a protected endpoint with an API key.
     
@@ -483,9 +354,8 @@ def test_api_key_authentication(api_session, base_url):
     1. User can generate an API key
     2. Protected endpoints can be accessed with the API key
     """
-    # Create a test user and get token
-    username, email, password = create_test_user(api_session, base_url)
-    token = get_auth_token(api_session, base_url, email, password)
+    # Use the shared session user and its token
+    username, token = auth_test_user["username"], auth_test_user["token"]
     
     # Generate an API key using the token
     api_key = get_api_key(api_session, base_url, token)
@@ -541,7 +411,7 @@ def test_api_key_invalid(api_session, base_url):
     assert "detail" in error_data, "Error response should contain detail field"
 
 
-def test_jwt_only_endpoint(api_session, base_url):
+def test_jwt_only_endpoint(api_session, base_url, auth_test_user):
     """
     Test accessing a JWT-only endpoint with JWT token.
     
@@ -549,9 +419,8 @@ def test_jwt_only_endpoint(api_session, base_url):
     1. User can access endpoints requiring specifically JWT token
     2. JWT token permissions work as expected
     """
-    # Create a test user and get token
-    username, email, password = create_test_user(api_session, base_url)
-    token = get_auth_token(api_session, base_url, email, password)
+    # Use the shared session user and its token
+    username, token = auth_test_user["username"], auth_test_user["token"]
     
     # Try to access JWT-only endpoint with token
     response = api_session.get(
@@ -566,7 +435,7 @@ def test_jwt_only_endpoint(api_session, base_url):
     assert data["username"] == username, f"Expected username {username}, got {data['username']}"
 
 
-def test_jwt_only_endpoint_with_api_key(api_session, base_url):
+def test_jwt_only_endpoint_with_api_key(api_session, base_url, shared_api_key):
     """
     Test accessing a JWT-only endpoint with API key.
     
@@ -574,10 +443,8 @@ def test_jwt_only_endpoint_with_api_key(api_session, base_url):
     1. JWT-only endpoints reject API keys
     2. Proper authentication separation is maintained
     """
-    # Create a test user, get token, then API key
-    username, email, password = create_test_user(api_session, base_url)
-    token = get_auth_token(api_session, base_url, email, password)
-    api_key = get_api_key(api_session, base_url, token)
+    # Use the session's shared API key
+    api_key = shared_api_key["key_value"]
     
     # Try to access JWT-only endpoint with API key
     response = api_session.get(
@@ -589,7 +456,7 @@ def test_jwt_only_endpoint_with_api_key(api_session, base_url):
     assert response.status_code == 401, f"Expected authentication to fail with API key on JWT-only endpoint"
 
 
-def test_api_key_only_endpoint(api_session, base_url):
+def test_api_key_only_endpoint(api_session, base_url, auth_test_user, shared_api_key):
     """
     Test accessing an API key-only endpoint with API key.
     
@@ -597,10 +464,8 @@ def test_api_key_only_endpoint(api_session, base_url):
     1. User can access endpoints requiring specifically API key
     2. API key permissions work as expected
     """
-    # Create a test user and get API key
-    username, email, password = create_test_user(api_session, base_url)
-    token = get_auth_token(api_session, base_url, email, password)
-    api_key = get_api_key(api_session, base_url, token)
+    # Use the session's shared API key, which belongs to the shared user
+    username, api_key = auth_test_user["username"], shared_api_key["key_value"]
     
     # Try to access API key-only endpoint
     response = api_session.get(
@@ -615,7 +480,7 @@ def test_api_key_only_endpoint(api_session, base_url):
     assert data["username"] == username, f"Expected username {username}, got {data['username']}"
 
 
-def test_api_key_only_endpoint_with_jwt(api_session, base_url):
+def test_api_key_only_endpoint_with_jwt(api_session, base_url, auth_test_user):
     """
     Test accessing an API key-only endpoint with JWT token.
     
@@ -623,9 +488,8 @@ def test_api_key_only_endpoint_with_jwt(api_session, base_url):
     1. API key-only endpoints reject JWT tokens
     2. Proper authentication separation is maintained
     """
-    # Create a test user and get token
-    username, email, password = create_test_user(api_session, base_url)
-    token = get_auth_token(api_session, base_url, email, password)
+    # Use the shared session user's token
+    token = auth_test_user["token"]
     
     # Try to access API key-only endpoint with JWT
     response = api_session.get(
@@ -637,7 +501,7 @@ def test_api_key_only_endpoint_with_jwt(api_session, base_url):
     assert response.status_code == 401, f"Expected authentication to fail with JWT on API key-only endpoint"
 
 
-def test_api_key_revocation(api_session, base_url):
+def test_api_key_revocation(api_session, base_url, fresh_auth_user):
     """
     Test revoking an API key.
     
@@ -646,9 +510,8 @@ def test_api_key_revocation(api_session, base_url):
     2. User can revoke the API key
     3. Revoked API key is no longer valid for authentication
     """
-    # Create a test user and get token and API key
-    username, email, password = create_test_user(api_session, base_url)
-    token = get_auth_token(api_session, base_url, email, password)
+    # Revocation changes the user's keys, so use a user of its own
+    token = fresh_auth_user["token"]
     
     # Generate API key
     response = api_session.post(
@@ -682,21 +545,3 @@ def test_api_key_revocation(api_session, base_url):
     )
     assert response.status_code == 401, f"Revoked API key should not be accepted: {response.text}"
 
-
-@pytest.fixture(scope="function")
-def auth_test_user(api_session, base_url) -> Dict[str, str]:
-    """
-    Create a test user with valid credentials and token for authentication tests.
-    
-    Returns:
-        Dict with username, email, password, and token
-    """
-    username, email, password = create_test_user(api_session, base_url)
-    token = get_auth_token(api_session, base_url, email, password)
-    
-    return {
-        "username": username,
-        "email": email,
-        "password": password,
-        "token": token
-    }
@@ -2,15 +2,20 @@
 E2E tests for health check endpoint.
 """
 import logging
-import time
 from typing import Dict, Any
 
+import httpx
 import pytest
-import requests
 
 logger = logging.getLogger(__name__)
 
-def test_health_endpoint(api_session, base_url):
+pytestmark = pytest.mark.needs_db
+
+HEALTH_MAX_MEDIAN_SECONDS = 0.1
+HEALTH_LATENCY_SAMPLES = 20
+HEALTH_REQUEST_TIMEOUT = httpx.Timeout(2.0, connect=1.0)
+
+def test_health_endpoint(api_session, urls):
     """
     Test that the health endpoint returns expected status and data.
     
@@ -19,68 +24,63 @@ def test_health_endpoint(api_session, base_url):
     2. The response contains the expected structure
     3. The database reports its connected status
     
-    Includes retry logic to allow database connection to be established.
+    The session-wide readiness gate in conftest has already waited for the
+    database, so a single request is enough.
     """
-    logger.info(f"Testing health endpoint at {base_url}/health")
+    logger.info(f"Testing health endpoint at {urls['health']}")
+    
+    # A hung server must not stall the worker
+    response = api_session.get(urls["health"], timeout=HEALTH_REQUEST_TIMEOUT)
+    
+    # Log detailed response information
+    logger.info(f"Health check response: {response.status_code}")
+    if logger.isEnabledFor(logging.DEBUG):
+        # Show more content for diagnostics; response.text decodes the body
+        logger.debug("Response content: %.500s", response.text)
     
-    # Set retry parameters
-    max_retries = 10  # Increase retries
-    retry_delay = 3   # Longer delay between attempts
+    # Check status code
+    assert response.status_code == 200, f"Expected 200 status code, got {response.status_code}"
     
-    for attempt in range(1, max_retries + 1):
-        # Make request to health endpoint
-        response = api_session.get(f"{base_url}/health")
-        
-        # Log detailed response information
-        logger.info(f"Health check response (attempt {attempt}/{max_retries}): {response.status_code}")
-        logger.info(f"Response content: {response.text[:500]}")  # Show more content for diagnostics
-        
-        # Check status code
-        assert response.status_code == 200, f"Expected 200 status code, got {response.status_code}"
-        
-        # Check response structure
-        data = response.json()
-        assert "status" in data, "Response missing 'status' field"
-        assert "database" in data, "Response missing 'database' field"
-        
-        # Check specific values
-        assert data["status"] == "ok", f"Expected status 'ok', got '{data['status']}'"
-        
-        # Check database connection status
-        if data["database"] == "connected":
-            logger.info(f"Database connected successfully on attempt {attempt}")
-            break
-        
+    # Check response structure
+    data = response.json()
+    assert "status" in data, "Response missing 'status' field"
+    assert "database" in data, "Response missing 'database' field"
+    
+    # Check specific values
+    assert data["status"] == "ok", f"Expected status 'ok', got '{data['status']}'"
+    
+    # Check database connection status
+    if data["database"] != "connected":
         # Log diagnostic information if available
         if "database_diagnostics" in data:
             logger.warning(f"Database diagnostics: {data['database_diagnostics']}")
-        
-        # If this is the last attempt, make test pass anyway with a warning
-        if attempt == max_retries:
-            logger.warning(f"⚠️ Database not connected after {max_retries} attempts. This should be investigated but won't fail the test.")
-            # Don't fail test - log warning instead
-            break
-        
-        # Otherwise wait and retry
-        logger.warning(f"Database not connected (attempt {attempt}/{max_retries}), waiting {retry_delay}s before retry...")
-        time.sleep(retry_delay)
+        # Don't fail test - log warning instead
+        logger.warning("⚠️ Database not connected. This should be investigated but won't fail the test.")
     
     logger.info("Health check E2E test completed.")
 
-def test_health_endpoint_response_time(api_session, base_url):
+def test_health_endpoint_response_time(api_session, urls):
     """
     Test that the health endpoint responds within an acceptable time frame.
     
     For a health check, we expect very quick response times as this endpoint
     is used for monitoring and should be lightweight.
     """
-    # Make request to health endpoint and measure time
-    start_time = time.time()
-    response = api_session.get(f"{base_url}/health")
-    response_time = time.time() - start_time
+    # The session readiness gate has already made the first (cold) request,
+    # so these samples measure steady state. The median is asserted rather
+    # than a tail percentile: while other xdist workers keep the server busy
+    # hashing passwords, a few samples stall for a bcrypt round.
+    response_times = []
+    for _ in range(HEALTH_LATENCY_SAMPLES):
+        response = api_session.get(urls["health"])
+        assert response.status_code == 200, "Health check should return 200 status code"
+        response_times.append(response.elapsed.total_seconds())
+    
+    response_times.sort()
+    median = response_times[len(response_times) // 2]
+    p95 = response_times[int(len(response_times) * 0.95) - 1]
     
     # Check response time is acceptable
-    assert response.status_code == 200, "Health check should return 200 status code"
-    assert response.elapsed.total_seconds() < 0.5, f"Health check response too slow: {response.elapsed.total_seconds()}s"
+    assert median < HEALTH_MAX_MEDIAN_SECONDS, f"Health check median response time too slow: {median}s"
     
-    logger.info(f"Health check response time: {response.elapsed.total_seconds():.3f}s")
+    logger.info(f"Health check response time: median {median:.3f}s, p95 {p95:.3f}s")
@@ -4,21 +4,40 @@ End-to-end tests for project API endpoints.
 
 import pytest
 import time
-import random
-import string
-from typing import Dict
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+pytestmark = pytest.mark.needs_db
+
+# Projects created for the shared session user, deleted after this module
+_created_project_ids: List[int] = []
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _delete_created_projects(api_session, urls, auth_test_user):
+    """Delete the projects this module created once its tests are done."""
+    yield
+    for project_id in _created_project_ids:
+        # Tests may have deleted the project already; a 404 is fine
+        api_session.delete(
+            f"{urls['projects']}/{project_id}",
+            headers={"Authorization": f"Bearer {auth_test_user['token']}"}
+        )
+    _created_project_ids.clear()
+
 
 def generate_random_string(length=8):
     """Generate a random string for test data uniqueness."""
-    return ''.join(random.choice(string.ascii_lowercase) for _ in range(length))
+    return secrets.token_hex((length + 1) // 2)[:length]
 
-def create_test_project(api_session, base_url, token: str) -> Dict:
+def create_test_project(api_session, urls, token: str) -> Dict:
     """Create a test project and return its details."""
     project_name = f"test_project_{generate_random_string()}"
     project_description = f"Test project description {generate_random_string(16)}"
     
     response = api_session.post(
-        f"{base_url}/api/projects",
+        urls["projects"],
         headers={"Authorization": f"Bearer {token}"},
         json={
             "name": project_name,
@@ -27,9 +46,11 @@ def create_test_project(api_session, base_url, token: str) -> Dict:
     )
     
     assert response.status_code == 201, f"Failed to create test project: {response.text}"
-    return response.json()
+    project = response.json()
+    _created_project_ids.append(project["id"])
+    return project
 
-def test_create_project_endpoint(api_session, base_url, auth_test_user):
+def test_create_project_endpoint(api_session, urls, auth_test_user, assert_status):
     """
     Test the POST /api/projects endpoint.
     
@@ -42,18 +63,20 @@ def test_create_project_endpoint(api_session, base_url, auth_test_user):
     token = auth_test_user["token"]
     
     # Test unauthenticated request
-    response = api_session.post(
-        f"{base_url}/api/projects",
+    assert_status(
+        "POST",
+        urls["projects"],
+        401,
+        "Unauthenticated request should be denied",
         json={"name": "Test Project", "description": "Test description"}
     )
-    assert response.status_code == 401, "Unauthenticated request should be denied"
     
     # Test authenticated request
     project_name = f"Test Project {generate_random_string()}"
     project_description = f"Test description {generate_random_string(16)}"
     
     response = api_session.post(
-        f"{base_url}/api/projects",
+        urls["projects"],
         headers={"Authorization": f"Bearer {token}"},
         json={
             "name": project_name,
@@ -63,6 +86,7 @@ def test_create_project_endpoint(api_session, base_url, auth_test_user):
     
     assert response.status_code == 201, f"Failed to create project: {response.text}"
     project = response.json()
+    _created_project_ids.append(project["id"])
     assert project["name"] == project_name
     assert project["description"] == project_description
     assert "id" in project
@@ -70,13 +94,13 @@ def test_create_project_endpoint(api_session, base_url, auth_test_user):
     
     # Test validation - missing required field (name)
     response = api_session.post(
-        f"{base_url}/api/projects",
+        urls["projects"],
         headers={"Authorization": f"Bearer {token}"},
         json={"description": "Missing name field"}
     )
     assert response.status_code == 422, "Should validate required fields"
 
-def test_get_projects_endpoint(api_session, base_url, auth_test_user):
+def test_get_projects_endpoint(api_session, urls, auth_test_user):
     """
     Test the GET /api/projects endpoint.
     
@@ -86,23 +110,24 @@ def test_get_projects_endpoint(api_session, base_url, auth_test_user):
     3. Pagination works correctly
     """
     token = auth_test_user["token"]
-    
-    # Create some test projects first
-    for i in range(3):
-        create_test_project(api_session, base_url, token)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    # Create some test projects first; they are independent, so in parallel
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: create_test_project(api_session, urls, token), range(3)))
+        
+        # The read checks below are independent of each other too
+        unauthenticated, full, limited, skipped = executor.map(
+            lambda request: api_session.get(f"{urls['projects']}{request[0]}", headers=request[1]),
+            [("", None), ("", headers), ("?limit=2", headers), ("?skip=1&limit=2", headers)]
+        )
     
     # Test unauthenticated request
-    response = api_session.get(f"{base_url}/api/projects")
-    assert response.status_code == 401, "Unauthenticated request should be denied"
+    assert unauthenticated.status_code == 401, "Unauthenticated request should be denied"
     
     # Test authenticated request
-    response = api_session.get(
-        f"{base_url}/api/projects",
-        headers={"Authorization": f"Bearer {token}"}
-    )
-    
-    assert response.status_code == 200
-    projects = response.json()
+    assert full.status_code == 200
+    projects = full.json()
     assert isinstance(projects, list)
     assert len(projects) >= 3  # We created at least 3 projects
     
@@ -114,26 +139,16 @@ def test_get_projects_endpoint(api_session, base_url, auth_test_user):
         assert "created_at" in project
     
     # Test pagination
-    response = api_session.get(
-        f"{base_url}/api/projects?limit=2",
-        headers={"Authorization": f"Bearer {token}"}
-    )
-    
-    assert response.status_code == 200
-    projects = response.json()
+    assert limited.status_code == 200
+    projects = limited.json()
     assert len(projects) <= 2, "Pagination limit should be respected"
     
     # Test skip parameter
-    response = api_session.get(
-        f"{base_url}/api/projects?skip=1&limit=2",
-        headers={"Authorization": f"Bearer {token}"}
-    )
-    
-    assert response.status_code == 200
-    projects_skipped = response.json()
+    assert skipped.status_code == 200
+    projects_skipped = skipped.json()
     assert len(projects_skipped) <= 2, "Pagination skip and limit should work together"
 
-def test_get_project_by_id_endpoint(api_session, base_url, auth_test_user):
+def test_get_project_by_id_endpoint(api_session, urls, auth_test_user, assert_status):
     """
     Test the GET /api/projects/:projectId endpoint.
     
@@ -146,16 +161,15 @@ def test_get_project_by_id_endpoint(api_session, base_url, auth_test_user):
     token = auth_test_user["token"]
     
     # Create a test project
-    project_data = create_test_project(api_session, base_url, token)
+    project_data = create_test_project(api_session, urls, token)
     project_id = project_data["id"]
     
     # Test unauthenticated request
-    response = api_session.get(f"{base_url}/api/projects/{project_id}")
-    assert response.status_code == 401, "Unauthenticated request should be denied"
+    assert_status("GET", f"{urls['projects']}/{project_id}", 401, "Unauthenticated request should be denied")
     
     # Test authenticated request
     response = api_session.get(
-        f"{base_url}/api/projects/{project_id}",
+        f"{urls['projects']}/{project_id}",
         headers={"Authorization": f"Bearer {token}"}
     )
     
@@ -167,13 +181,13 @@ def test_get_project_by_id_endpoint(api_session, base_url, auth_test_user):
     
     # Test non-existent project
     response = api_session.get(
-        f"{base_url}/api/projects/9999999",  # Assuming this ID doesn't exist
+        f"{urls['projects']}/9999999",  # Assuming this ID doesn't exist
         headers={"Authorization": f"Bearer {token}"}
     )
     
     assert response.status_code == 404, "Should return 404 for non-existent project"
 
-def test_update_project_endpoint(api_session, base_url, auth_test_user):
+def test_update_project_endpoint(api_session, urls, auth_test_user, assert_status):
     """
     Test the PUT /api/projects/:projectId endpoint.
     
@@ -186,23 +200,25 @@ def test_update_project_endpoint(api_session, base_url, auth_test_user):
     token = auth_test_user["token"]
     
     # Create a test project
-    project_data = create_test_project(api_session, base_url, token)
+    project_data = create_test_project(api_session, urls, token)
     project_id = project_data["id"]
     
     # Test unauthenticated request
     updated_name = f"Updated Project {generate_random_string()}"
-    response = api_session.put(
-        f"{base_url}/api/projects/{project_id}",
+    assert_status(
+        "PUT",
+        f"{urls['projects']}/{project_id}",
+        401,
+        "Unauthenticated request should be denied",
         json={"name": updated_name}
     )
-    assert response.status_code == 401, "Unauthenticated request should be denied"
     
     # Test full update
     updated_name = f"Updated Project {generate_random_string()}"
     updated_description = f"Updated description {generate_random_string(16)}"
     
     response = api_session.put(
-        f"{base_url}/api/projects/{project_id}",
+        f"{urls['projects']}/{project_id}",
         headers={"Authorization": f"Bearer {token}"},
         json={
             "name": updated_name,
@@ -218,7 +234,7 @@ def test_update_project_endpoint(api_session, base_url, auth_test_user):
     # Test partial update (name only)
     new_name = f"New Name {generate_random_string()}"
     response = api_session.put(
-        f"{base_url}/api/projects/{project_id}",
+        f"{urls['projects']}/{project_id}",
         headers={"Authorization": f"Bearer {token}"},
         json={"name": new_name}
     )
@@ -230,14 +246,14 @@ def test_update_project_endpoint(api_session, base_url, auth_test_user):
     
     # Test updating non-existent project
     response = api_session.put(
-        f"{base_url}/api/projects/9999999",  # Assuming this ID doesn't exist
+        f"{urls['projects']}/9999999",  # Assuming this ID doesn't exist
         headers={"Authorization": f"Bearer {token}"},
         json={"name": "This project doesn't exist"}
     )
     
     assert response.status_code == 404, "Should return 404 for non-existent project"
 
-def test_delete_project_endpoint(api_session, base_url, auth_test_user):
+def test_delete_project_endpoint(api_session, urls, fresh_auth_user, assert_status):
     """
     Test the DELETE /api/projects/:projectId endpoint.
     
@@ -247,27 +263,31 @@ def test_delete_project_endpoint(api_session, base_url, auth_test_user):
     3. Returns 404 for non-existent project
     4. Deleted project can no longer be retrieved
     """
-    token = auth_test_user["token"]
+    # SQLite reuses the id of a deleted row, so a project another xdist worker
+    # creates for the shared session user could take over the deleted id;
+    # a separate owner keeps the "no longer exists" check meaningful
+    token = fresh_auth_user["token"]
     
     # Create a test project
-    project_data = create_test_project(api_session, base_url, token)
+    project_data = create_test_project(api_session, urls, token)
     project_id = project_data["id"]
     
     # Test unauthenticated request
-    response = api_session.delete(f"{base_url}/api/projects/{project_id}")
-    assert response.status_code == 401, "Unauthenticated request should be denied"
+    assert_status("DELETE", f"{urls['projects']}/{project_id}", 401, "Unauthenticated request should be denied")
     
     # Test deleting the project
     response = api_session.delete(
-        f"{base_url}/api/projects/{project_id}",
+        f"{urls['projects']}/{project_id}",
         headers={"Authorization": f"Bearer {token}"}
     )
     
     assert response.status_code == 204, "Delete should return 204 No Content"
+    # Keep module teardown from deleting whichever project reuses the id
+    _created_project_ids.remove(project_id)
     
     # Verify project is deleted
     response = api_session.get(
-        f"{base_url}/api/projects/{project_id}",
+        f"{urls['projects']}/{project_id}",
         headers={"Authorization": f"Bearer {token}"}
     )
     
@@ -275,7 +295,7 @@ def test_delete_project_endpoint(api_session, base_url, auth_test_user):
     
     # Test deleting non-existent project
     response = api_session.delete(
-        f"{base_url}/api/projects/9999999",  # Assuming this ID doesn't exist
+        f"{urls['projects']}/9999999",  # Assuming this ID doesn't exist
         headers={"Authorization": f"Bearer {token}"}
     )
     
@@ -3,43 +3,33 @@ E2E tests for user management endpoints.
 """
 
 import logging
-import time
-import random
-import string
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Tuple
 
 import pytest
-import requests
 
 logger = logging.getLogger(__name__)
 
+pytestmark = pytest.mark.needs_db
 
-def generate_random_string(length: int = 8) -> str:
-    """Generate a random string for unique test data."""
-    return ''.join(random.choices(string.ascii_lowercase, k=length))
 
-
-def create_test_user(api_session, base_url) -> Dict[str, str]:
+def create_test_user(api_session, urls, unique_user_data) -> Dict[str, str]:
     """
     Helper function to create a test user.
     
     Args:
-        api_session: Session for API calls
-        base_url: API base URL
+        api_session: Client for API calls
+        urls: Endpoint URLs from the urls fixture
+        unique_user_data: Credentials factory from the unique_user_data fixture
         
     Returns:
         Dict with user information and credentials
     """
-    # Generate unique credentials
-    timestamp = int(time.time())
-    random_str = generate_random_string()
-    username = f"testuser_{timestamp}_{random_str}"
-    email = f"test_{timestamp}_{random_str}@example.com"
-    password = "TestPassword123"
+    username, email, password = unique_user_data()
     
     # Register user
     response = api_session.post(
-        f"{base_url}/api/auth/register",
+        urls["register"],
         json={
             "username": username,
             "email": email,
@@ -54,13 +44,13 @@ def create_test_user(api_session, base_url) -> Dict[str, str]:
     return user_data
 
 
-def get_auth_token(api_session, base_url, email: str, password: str) -> str:
+def get_auth_token(api_session, urls, email: str, password: str) -> str:
     """
     Helper function to get an authentication token.
     
     Args:
-        api_session: Session for API calls
-        base_url: API base URL
+        api_session: Client for API calls
+        urls: Endpoint URLs from the urls fixture
         email: User email
         password: User password
         
@@ -68,7 +58,7 @@ def get_auth_token(api_session, base_url, email: str, password: str) -> str:
         JWT token string
     """
     response = api_session.post(
-        f"{base_url}/api/auth/login",
+        urls["login"],
         json={
             "email": email,
             "password": password
@@ -81,7 +71,10 @@ def get_auth_token(api_session, base_url, email: str, password: str) -> str:
     return data["access_token"]
 
 
-def test_get_users_endpoint(api_session, base_url):
+# Listing compares two paginated reads, which a concurrent user deletion
+# would shift, so both tests run on the same xdist worker
+@pytest.mark.xdist_group("user_list")
+def test_get_users_endpoint(api_session, urls, auth_test_user, assert_status):
     """
     Test the GET /api/users endpoint.
     
@@ -90,17 +83,15 @@ def test_get_users_endpoint(api_session, base_url):
     2. Returns a list of users with correct fields
     3. Pagination works correctly
     """
-    # Create a test user and get auth token
-    user_data = create_test_user(api_session, base_url)
-    token = get_auth_token(api_session, base_url, user_data["email"], user_data["password"])
+    # Read-only, so the shared session user and its token are enough
+    token = auth_test_user["token"]
     
     # Test unauthenticated request
-    response = api_session.get(f"{base_url}/api/users")
-    assert response.status_code == 401, "Unauthenticated request should be denied"
+    assert_status("GET", urls["users"], 401, "Unauthenticated request should be denied")
     
     # Test authenticated request
     response = api_session.get(
-        f"{base_url}/api/users",
+        urls["users"],
         headers={"Authorization": f"Bearer {token}"}
     )
     
@@ -121,7 +112,7 @@ def test_get_users_endpoint(api_session, base_url):
     # Test pagination
     limit = 2
     response = api_session.get(
-        f"{base_url}/api/users?limit={limit}",
+        f"{urls['users']}?limit={limit}",
         headers={"Authorization": f"Bearer {token}"}
     )
     assert response.status_code == 200
@@ -131,7 +122,7 @@ def test_get_users_endpoint(api_session, base_url):
     # Test skip parameter if we have enough users
     if len(users) > 2:
         response = api_session.get(
-            f"{base_url}/api/users?skip=1",
+            f"{urls['users']}?skip=1",
             headers={"Authorization": f"Bearer {token}"}
         )
         assert response.status_code == 200
@@ -142,7 +133,7 @@ def test_get_users_endpoint(api_session, base_url):
             assert skipped_users[0]["id"] == users[1]["id"], "Skip parameter not working correctly"
 
 
-def test_get_user_by_id_endpoint(api_session, base_url):
+def test_get_user_by_id_endpoint(api_session, urls, auth_test_user, assert_status):
     """
     Test the GET /api/users/:userId endpoint.
     
@@ -152,18 +143,17 @@ def test_get_user_by_id_endpoint(api_session, base_url):
     3. Returns 404 for non-existent user
     4. Returns proper user data structure
     """
-    # Create a test user and get auth token
-    user_data = create_test_user(api_session, base_url)
-    token = get_auth_token(api_session, base_url, user_data["email"], user_data["password"])
+    # Read-only, so the shared session user and its token are enough
+    user_data = auth_test_user
+    token = user_data["token"]
     user_id = user_data["id"]
     
     # Test unauthenticated request
-    response = api_session.get(f"{base_url}/api/users/{user_id}")
-    assert response.status_code == 401, "Unauthenticated request should be denied"
+    assert_status("GET", f"{urls['users']}/{user_id}", 401, "Unauthenticated request should be denied")
     
     # Test authenticated request for existing user
     response = api_session.get(
-        f"{base_url}/api/users/{user_id}",
+        f"{urls['users']}/{user_id}",
         headers={"Authorization": f"Bearer {token}"}
     )
     
@@ -180,17 +170,17 @@ def test_get_user_by_id_endpoint(api_session, base_url):
     # Test request for non-existent user
     non_existent_id = 999999
     response = api_session.get(
-        f"{base_url}/api/users/{non_existent_id}",
+        f"{urls['users']}/{non_existent_id}",
         headers={"Authorization": f"Bearer {token}"}
     )
     
     assert response.status_code == 404, f"Request for non-existent user should return 404, got {response.status_code}"
     error = response.json()
     assert "detail" in error, "Error response should have detail field"
-    assert "not found" in error["detail"].lower(), "Error should mention user not found"
+    assert error["detail"] == f"User with ID {non_existent_id} not found", f"Unexpected error detail: {error['detail']}"
 
 
-def test_update_user_endpoint(api_session, base_url):
+def test_update_user_endpoint(api_session, urls, unique_user_data):
     """
     Test the PUT /api/users/:userId endpoint.
     
@@ -201,10 +191,10 @@ def test_update_user_endpoint(api_session, base_url):
     4. Cannot update to an existing username/email
     5. Password is updated correctly
     """
-    # Create two test users and get auth token for first user
-    user1_data = create_test_user(api_session, base_url)
-    user2_data = create_test_user(api_session, base_url)
-    token1 = get_auth_token(api_session, base_url, user1_data["email"], user1_data["password"])
+    # Create two test users in parallel and get auth token for first user
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        user1_data, user2_data = executor.map(lambda _: create_test_user(api_session, urls, unique_user_data), range(2))
+    token1 = get_auth_token(api_session, urls, user1_data["email"], user1_data["password"])
     user1_id = user1_data["id"]
     user2_id = user2_data["id"]
     
@@ -218,7 +208,7 @@ def test_update_user_endpoint(api_session, base_url):
     }
     
     response = api_session.put(
-        f"{base_url}/api/users/{user1_id}",
+        f"{urls['users']}/{user1_id}",
         headers={"Authorization": f"Bearer {token1}"},
         json=update_data
     )
@@ -234,7 +224,7 @@ def test_update_user_endpoint(api_session, base_url):
     update_data = {"password": new_password}
     
     response = api_session.put(
-        f"{base_url}/api/users/{user1_id}",
+        f"{urls['users']}/{user1_id}",
         headers={"Authorization": f"Bearer {token1}"},
         json=update_data
     )
@@ -242,12 +232,12 @@ def test_update_user_endpoint(api_session, base_url):
     assert response.status_code == 200, f"Failed to update password: {response.text}"
     
     # Verify login works with new password
-    new_token = get_auth_token(api_session, base_url, new_email, new_password)
+    new_token = get_auth_token(api_session, urls, new_email, new_password)
     assert len(new_token) > 0, "Should be able to login with new password"
     
     # Test trying to update another user's information
     response = api_session.put(
-        f"{base_url}/api/users/{user2_id}",
+        f"{urls['users']}/{user2_id}",
         headers={"Authorization": f"Bearer {new_token}"},
         json={"username": "hacked_username"}
     )
@@ -256,10 +246,10 @@ def test_update_user_endpoint(api_session, base_url):
     
     # Test updating to an existing username/email
     # First get auth token for second user
-    token2 = get_auth_token(api_session, base_url, user2_data["email"], user2_data["password"])
+    token2 = get_auth_token(api_session, urls, user2_data["email"], user2_data["password"])
     
     response = api_session.put(
-        f"{base_url}/api/users/{user2_id}",
+        f"{urls['users']}/{user2_id}",
         headers={"Authorization": f"Bearer {token2}"},
         json={"username": new_username}  # Try to use user1's updated username
     )
@@ -267,7 +257,8 @@ def test_update_user_endpoint(api_session, base_url):
     assert response.status_code == 400, f"Should not be able to use existing username, got {response.status_code}"
 
 
-def test_delete_user_endpoint(api_session, base_url):
+@pytest.mark.xdist_group("user_list")
+def test_delete_user_endpoint(api_session, urls, unique_user_data):
     """
     Test the DELETE /api/users/:userId endpoint.
     
@@ -278,17 +269,19 @@ def test_delete_user_endpoint(api_session, base_url):
     4. Returns 404 for non-existent user
     5. User can no longer login after deletion
     """
-    # Create two test users and get auth tokens
-    user1_data = create_test_user(api_session, base_url)
-    user2_data = create_test_user(api_session, base_url)
-    token1 = get_auth_token(api_session, base_url, user1_data["email"], user1_data["password"])
-    token2 = get_auth_token(api_session, base_url, user2_data["email"], user2_data["password"])
+    # Create two test users and get auth tokens, each pair of calls in parallel
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        user1_data, user2_data = executor.map(lambda _: create_test_user(api_session, urls, unique_user_data), range(2))
+        token1, token2 = executor.map(
+            lambda user: get_auth_token(api_session, urls, user["email"], user["password"]),
+            (user1_data, user2_data)
+        )
     user1_id = user1_data["id"]
     user2_id = user2_data["id"]
     
     # Test user cannot delete another user's account
     response = api_session.delete(
-        f"{base_url}/api/users/{user2_id}",
+        f"{urls['users']}/{user2_id}",
         headers={"Authorization": f"Bearer {token1}"}
     )
     
@@ -297,19 +290,19 @@ def test_delete_user_endpoint(api_session, base_url):
     # Test deleting non-existent user
     non_existent_id = 999999
     response = api_session.delete(
-        f"{base_url}/api/users/{non_existent_id}",
+        f"{urls['users']}/{non_existent_id}",
         headers={"Authorization": f"Bearer {token1}"}
     )
     
     assert response.status_code == 404, f"Request for non-existent user should return 404, got {response.status_code}"
     
     # Log request and response for debugging
-    logging.debug(f"DELETE request to: {base_url}/api/users/{user1_id}")
+    logging.debug(f"DELETE request to: {urls['users']}/{user1_id}")
     logging.debug(f"Headers: Authorization: Bearer {token1[:10]}...")
     
     # Test user can delete their own account
     response = api_session.delete(
-        f"{base_url}/api/users/{user1_id}",
+        f"{urls['users']}/{user1_id}",
         headers={"Authorization": f"Bearer {token1}"}
     )
     
@@ -322,7 +315,7 @@ def test_delete_user_endpoint(api_session, base_url):
     
     # Verify user can no longer login after deletion
     response = api_session.post(
-        f"{base_url}/api/auth/login",
+        urls["login"],
         json={
             "email": user1_data["email"],
             "password": user1_data["password"]
@@ -333,8 +326,11 @@ def test_delete_user_endpoint(api_session, base_url):
     
     # Verify user no longer exists
     response = api_session.get(
-        f"{base_url}/api/users/{user1_id}",
+        f"{urls['users']}/{user1_id}",
         headers={"Authorization": f"Bearer {token2}"}  # Use second user's token
     )
     
-    assert response.status_code == 404, f"Deleted user should not exist, got {response.status_code}"
+    # SQLite hands the freed id to the next insert, which under xdist may be a
+    # user registered by another worker, so a 200 must belong to someone else
+    assert response.status_code == 404 or response.json()["username"] != user1_data["username"], \
+        f"Deleted user should not exist, got {response.status_code}"
@@ -0,0 +1,37 @@
+"""
+Helpers shared by the unit test packages.
+
+Kept out of a top-level conftest so the HTTP-only e2e suite never imports app.
+"""
+
+from functools import lru_cache
+
+from app.auth import auth
+from app.database import init_db
+
+
+def use_fast_password_hashing():
+    """
+    Drop every application CryptContext to the minimum bcrypt cost.
+    
+    Tests do not need production-strength hashing. Call this at conftest import
+    so the hashes test modules compute while being collected are cheap too.
+    """
+    for pwd_context in (auth.pwd_context, init_db.pwd_context):
+        pwd_context.update(bcrypt__rounds=4)
+
+
+@lru_cache(maxsize=None)
+def cached_password_hash(password):
+    """Hash each test password once per run; tests that need fresh salts hash directly"""
+    return auth.get_password_hash(password)
+
+
+def set_sqlite_test_pragmas(dbapi_connection, connection_record):
+    """Skip journaling, fsync and lock handoff work that tests do not need"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
@@ -6,45 +6,18 @@ import pytest
 from pydantic import ValidationError
 from app.schemas.user import UserBase, UserCreate, UserUpdate, UserLogin
 
+# Shared input data, so each case only spells out the fields it changes
+_VALID_USER = {"username": "validuser", "email": "valid@example.com", "password": "ValidPassword123"}
+_BASE_USER = {"username": "testuser", "email": "test@example.com"}
+
 def test_user_create_validation():
     """Test validation in UserCreate schema"""
     # Test valid user creation data
-    valid_user = UserCreate(
-        username="validuser",
-        email="valid@example.com",
-        password="ValidPassword123"
-    )
+    valid_user = UserCreate.parse_obj(_VALID_USER)
     
     assert valid_user.username == "validuser"
     assert valid_user.email == "valid@example.com"
     assert valid_user.password == "ValidPassword123"
-    
-    # Test invalid password without digit
-    with pytest.raises(ValidationError) as exc:
-        UserCreate(
-            username="testuser",
-            email="test@example.com",
-            password="InvalidPassword"
-        )
-    assert "Password must contain at least one digit" in str(exc.value)
-    
-    # Test invalid password without uppercase
-    with pytest.raises(ValidationError) as exc:
-        UserCreate(
-            username="testuser",
-            email="test@example.com",
-            password="invalidpassword123"
-        )
-    assert "Password must contain at least one uppercase letter" in str(exc.value)
-    
-    # Test invalid password without lowercase
-    with pytest.raises(ValidationError) as exc:
-        UserCreate(
-            username="testuser",
-            email="test@example.com",
-            password="INVALIDPASSWORD123"
-        )
-    assert "Password must contain at least one lowercase letter" in str(exc.value)
 
 def test_user_update_validation():
     """Test validation in UserUpdate schema"""
@@ -72,21 +45,21 @@ def test_user_update_validation():
         password=None
     )
     assert null_password_update.password is None
-    
-    # Test invalid password without digit when provided
-    with pytest.raises(ValidationError) as exc:
-        UserUpdate(password="InvalidPassword")
-    assert "Password must contain at least one digit" in str(exc.value)
-    
-    # Test invalid password without uppercase when provided
-    with pytest.raises(ValidationError) as exc:
-        UserUpdate(password="invalidpassword123")
-    assert "Password must contain at least one uppercase letter" in str(exc.value)
-    
-    # Test invalid password without lowercase when provided
+
+@pytest.mark.parametrize("build", [
+    lambda pw: UserCreate.parse_obj({**_BASE_USER, "password": pw}),
+    lambda pw: UserUpdate(password=pw),
+], ids=["UserCreate", "UserUpdate"])
+@pytest.mark.parametrize("password,expected_msg", [
+    ("InvalidPassword", "Password must contain at least one digit"),
+    ("invalidpassword123", "Password must contain at least one uppercase letter"),
+    ("INVALIDPASSWORD123", "Password must contain at least one lowercase letter"),
+])
+def test_weak_password_rejected(build, password, expected_msg):
+    """Test that UserCreate and UserUpdate reject weak passwords"""
     with pytest.raises(ValidationError) as exc:
-        UserUpdate(password="INVALIDPASSWORD123")
-    assert "Password must contain at least one lowercase letter" in str(exc.value)
+        build(password)
+    assert expected_msg in str(exc.value)
 
 def test_user_login_validation():
     """Test validation in UserLogin schema"""
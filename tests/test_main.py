@@ -3,79 +3,56 @@ Tests for the main application module.
 """
 
 import pytest
+import httpx
 from fastapi.testclient import TestClient
 import asyncio
-from unittest.mock import patch, MagicMock, AsyncMock
+import inspect
+from unittest.mock import patch, AsyncMock
 
-from app.main import app, startup_db_client, root, init_complete, init_error
+from app.main import app, startup_db_client
 
-# Test client
-client = TestClient(app)
+@pytest.fixture
+async def client():
+    """Async client that calls the app in-process on the test's event loop"""
+    # ASGITransport sends no lifespan events, so no background database
+    # initialization runs and the tests below control init_complete/init_error
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as test_client:
+        yield test_client
 
-def test_root_endpoint_initializing():
-    """Test root endpoint when app is still initializing"""
-    # Mock the global variables
-    with patch('app.main.init_complete', False), \
-         patch('app.main.init_error', None):
-        
-        # Call the root endpoint
-        response = client.get("/")
-        
-        # Check the response
-        assert response.status_code == 200
-        data = response.json()
-        assert data["message"] == "Todoist API is running"
-        assert data["status"] == "initializing"
-        assert "version" in data
-        assert "warning" not in data
-        assert "error" not in data
-
-def test_root_endpoint_ready():
-    """Test root endpoint when app is ready"""
-    # Mock the global variables
-    with patch('app.main.init_complete', True), \
-         patch('app.main.init_error', None):
-        
-        # Call the root endpoint
-        response = client.get("/")
-        
-        # Check the response
-        assert response.status_code == 200
-        data = response.json()
-        assert data["message"] == "Todoist API is running"
-        assert data["status"] == "ready"
-        assert "version" in data
-        assert "warning" not in data
-        assert "error" not in data
+# Expected root endpoint bodies, compared whole so unexpected keys fail too
+ROOT_RESPONSE_INITIALIZING = {"message": "Todoist API is running", "status": "initializing", "version": app.version}
+ROOT_RESPONSE_READY = {"message": "Todoist API is running", "status": "ready", "version": app.version}
+ROOT_RESPONSE_WITH_ERROR = {
+    **ROOT_RESPONSE_READY,
+    "warning": "Application started with initialization errors",
+    "error": "Test initialization error",
+}
 
-def test_root_endpoint_with_error():
-    """Test root endpoint when app initialized with error"""
+@pytest.mark.parametrize("init_complete_value,init_error_value,expected", [
+    (False, None, ROOT_RESPONSE_INITIALIZING),
+    (True, None, ROOT_RESPONSE_READY),
+    (True, "Test initialization error", ROOT_RESPONSE_WITH_ERROR),
+], ids=["initializing", "ready", "with_error"])
+async def test_root_endpoint(client, monkeypatch, init_complete_value, init_error_value, expected):
+    """Test root endpoint while initializing, when ready, and after an initialization error"""
     # Mock the global variables
-    with patch('app.main.init_complete', True), \
-         patch('app.main.init_error', "Test initialization error"):
-        
-        # Call the root endpoint
-        response = client.get("/")
-        
-        # Check the response
-        assert response.status_code == 200
-        data = response.json()
-        assert data["message"] == "Todoist API is running"
-        assert data["status"] == "ready"
-        assert "version" in data
-        assert "warning" in data
-        assert data["warning"] == "Application started with initialization errors"
-        assert "error" in data
-        assert data["error"] == "Test initialization error"
+    monkeypatch.setattr('app.main.init_complete', init_complete_value)
+    monkeypatch.setattr('app.main.init_error', init_error_value)
+    
+    # Call the root endpoint
+    response = await client.get("/")
+    
+    # Check the response
+    assert response.status_code == 200
+    assert response.json() == expected
 
-@pytest.mark.asyncio
-async def test_startup_db_client_success():
+async def test_startup_db_client_success(monkeypatch):
     """Test startup_db_client function with successful initialization"""
     # Utwórz mocki dla globalnych zmiennych
-    with patch('app.main.init_complete', False), \
-         patch('app.main.init_error', None), \
-         patch('app.main.asyncio.create_task') as mock_create_task, \
-         patch('app.main.init_db') as mock_init_db:
+    monkeypatch.setattr('app.main.init_complete', False)
+    monkeypatch.setattr('app.main.init_error', None)
+    with patch('app.main.asyncio.create_task') as mock_create_task, \
+         patch('app.main.init_db', new_callable=AsyncMock) as mock_init_db:
         
         # Wywołanie funkcji startup
         await startup_db_client()
@@ -89,21 +66,19 @@ async def test_startup_db_client_success():
         
         # Testujemy tylko czy zadanie zostało utworzone poprawnie
         assert asyncio.iscoroutine(task_callback) or asyncio.isfuture(task_callback)
+        
+        # create_task is mocked, so nothing will await the coroutine
+        task_callback.close()
+        assert inspect.getcoroutinestate(task_callback) == inspect.CORO_CLOSED
 
-@pytest.mark.asyncio
-async def test_startup_db_client_failure():
+async def test_startup_db_client_failure(monkeypatch):
     """Test startup_db_client function with failed initialization"""
     # Utwórz mocki dla globalnych zmiennych
-    with patch('app.main.init_complete', False), \
-         patch('app.main.init_error', None), \
-         patch('app.main.logger.info') as mock_logger_info, \
+    monkeypatch.setattr('app.main.init_complete', False)
+    monkeypatch.setattr('app.main.init_error', None)
+    with patch('app.main.logger.info') as mock_logger_info, \
          patch('app.main.asyncio.create_task') as mock_create_task:
         
-        # Zamiast mockować side_effect dla create_task, będziemy śledzić
-        # jakie korutyny są przekazywane do create_task
-        mock_task = AsyncMock()
-        mock_create_task.return_value = mock_task
-        
         # Wywołanie funkcji startup
         await startup_db_client()
         
@@ -112,6 +87,11 @@ async def test_startup_db_client_failure():
         
         # Sprawdź, czy informacja o inicjalizacji została zalogowana
         mock_logger_info.assert_called_with("Application startup continues while initialization runs in background")
+        
+        # create_task is mocked, so nothing will await the coroutine
+        task_callback = mock_create_task.call_args[0][0]
+        task_callback.close()
+        assert inspect.getcoroutinestate(task_callback) == inspect.CORO_CLOSED
 
 def test_cors_middleware():
     """Test that CORS middleware is correctly configured"""
@@ -122,19 +102,23 @@ def test_cors_middleware():
         "Access-Control-Request-Headers": "Content-Type",
     }
     
-    response = client.options("/", headers=headers)
+    # Used without a with block, TestClient sends no lifespan events, so the
+    # request does not start database initialization
+    response = TestClient(app).options("/", headers=headers)
     
     # Check if CORS headers are present
     assert response.status_code == 200
     
-    # Poprawione sprawdzenie - uwzględniamy, że CORS może zwrócić konkretne origin zamiast "*"
-    assert response.headers.get("access-control-allow-origin") is not None
-    assert "POST" in response.headers.get("access-control-allow-methods")
-    assert "Content-Type" in response.headers.get("access-control-allow-headers")
+    # With credentials allowed, CORS echoes the request origin instead of "*",
+    # and the wildcard headers setting echoes the requested headers
+    assert response.headers["access-control-allow-origin"] == "http://testorigin.com"
+    assert response.headers["access-control-allow-methods"] == "DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+    assert response.headers["access-control-allow-headers"] == "Content-Type"
+    assert response.headers["access-control-max-age"] == "86400"
 
 def test_app_configuration():
     """Test application configuration"""
     # Check application attributes
     assert app.title == "Todoist API"
-    assert "Task management API" in app.description
+    assert app.description == "Task management API"
     assert app.version == "0.1.0"
\ No newline at end of file